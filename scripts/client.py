@@ -1,14 +1,38 @@
 #!/usr/bin/env python3
+import os
 import sys
+import lzma
+import zlib
+import struct
 import socket
 import logging
 import binascii
 import requests
 import json
 import time
+import itertools
 
-from typing import Tuple
+import numpy as np
 
+from typing import List, Optional, Tuple
+
+# bits and bytes per frame for the transmitter cube dimension
+FRAME_BITS = pow(int(os.environ.get('DIM', 4)), 3)
+FRAME_SIZE = FRAME_BITS // 8
+# simulated capture time per frame in seconds
+CAPTURE_DELAY = float(os.environ.get('CAPTURE_DELAY', 5))
+# simulated capture bit error rate, the probability of each captured bit being flipped
+CAPTURE_BER = float(os.environ.get('CAPTURE_BER', 0))
+# binary framing, mirrors tcs.tcp.protocol
+MAGIC = 0xA7
+VERSION = 1
+HEADER = struct.Struct('!BBBxIII')
+HELLO, DATA, UP, ACK, SACK, NACK, BEGIN, PING, PONG = range(1, 10)
+# bytes per streamed payload chunk
+CHUNK_SIZE = 4096
+# payload compression, mirrors tcs.tcu.compression
+COMPRESSION_LEVEL = 6
+COMPRESSION_THRESHOLD = 0.9
 
 logging.basicConfig(
     format="%(asctime)s %(levelname)s client %(message)s",
@@ -16,23 +40,231 @@ logging.basicConfig(
 )
 
 
+def pack(kind: int, seq: int, crc: int, payload: bytes = b'') -> bytes:
+    return HEADER.pack(MAGIC, VERSION, kind, seq, crc, len(payload)) + payload
+
+
+class Parser:
+    """Incremental parser for binary messages"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Tuple[int, int, int, bytes, bytes]]:
+        # parsed messages as (type, seq, crc, payload, raw header)
+        self.buffer += data
+        messages = []
+        while len(self.buffer) >= HEADER.size:
+            magic, version, kind, seq, crc, length = HEADER.unpack_from(self.buffer)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("unsupported protocol: {:#x} version {}".format(magic, version))
+            if len(self.buffer) < HEADER.size + length: break
+            raw = bytes(self.buffer[:HEADER.size + length])
+            messages.append((kind, seq, crc, raw[HEADER.size:], raw))
+            del self.buffer[:HEADER.size + length]
+        return messages
+
+
+class Hamming:
+    """Hamming(2^r - 1, 2^r - 1 - r) frame code, mirrors tcs.tcu.fec"""
+
+    def __init__(self, r: int):
+        self.r = r
+        self.n = pow(2, r) - 1
+        self.k = self.n - r
+        self.data_size = FRAME_BITS // self.n * self.k // 8
+        self.words = -(-self.data_size * 8 // self.k)
+        columns = np.array([v for v in range(1, self.n + 1) if v & (v - 1)])
+        self.parity = ((columns[:, None] >> np.arange(r)) & 1).astype(np.uint8)
+        self.positions = np.full(self.n + 1, -1)
+        self.positions[columns] = np.arange(self.k)
+        self.positions[1 << np.arange(r)] = self.k + np.arange(r)
+
+    def encode(self, block: bytes) -> bytes:
+        bits = np.unpackbits(np.frombuffer(block.ljust(self.data_size, b'\x00'), dtype=np.uint8))
+        bits = np.pad(bits, (0, self.words * self.k - len(bits))).reshape(self.words, self.k)
+        code = np.concatenate((bits, (bits @ self.parity) & 1), axis=1).ravel()
+        return np.packbits(np.pad(code, (0, FRAME_BITS - len(code)))).tobytes()
+
+    def decode(self, frame: bytes) -> Tuple[bytes, int]:
+        # corrected data block and number of corrected bits
+        bits = np.unpackbits(np.frombuffer(frame, dtype=np.uint8))
+        code = bits[:self.words * self.n].reshape(self.words, self.n)
+        syndrome = ((code[:, :self.k] @ self.parity) ^ code[:, self.k:]) & 1
+        errors = self.positions[syndrome.astype(int) @ (1 << np.arange(self.r))]
+        words = np.nonzero(errors >= 0)[0]
+        code[words, errors[words]] ^= 1
+        return np.packbits(code[:, :self.k].ravel()[:self.data_size * 8]).tobytes(), len(words)
+
+
 class Client:
 
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, token: str, window: Optional[int] = None, binary: bool = False,
+                 fec: Optional[int] = None, compress: Optional[str] = None):
         self.soc = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.soc.connect((host, port))
         self.message = None
+        self.window = None
+        self.parser = None
+        self.messages = []
+        self.fec = None
+        # payload bytes per frame
+        self.block = FRAME_SIZE
+        self.corrected = 0
+        self.flipped = 0
+        self.compression = None
+        # payload as displayed in frames, compressed if the session negotiated compression
+        self.payload = None
+        # present session token issued by the registration api and negotiate the window
+        if binary:
+            self.parser = Parser()
+            options = {'fec': fec, 'compress': compress}
+            hello = ' '.join([token] + ["{}={}".format(k, v) for k, v in options.items() if v is not None])
+            self.soc.sendall(pack(HELLO, window or 1, binascii.crc32(hello.encode()), hello.encode()))
+            kind, self.window, _, options, _ = self.receive_binary()
+            options = dict(option.split('=') for option in options.decode().split())
+            if 'fec' in options:
+                self.fec = Hamming(int(options['fec']))
+                self.block = self.fec.data_size
+            self.compression = options.get('compress')
+            logging.info("Negotiated binary session with window of %s frames and options %s", self.window, options)
+        elif window is None:
+            self.soc.send(token.encode() + b'\n')
+        else:
+            self.soc.send("{} {}\n".format(token, window).encode())
+            self.stream = self.soc.makefile('rb')
+            self.window = int(self.stream.readline())
+            logging.info("Negotiated window of %s frames", self.window)
 
     def run(self, message: str):
-        self.message = message
+        self.message = message.encode()
+        self.payload = self.message
         logging.info("Sending echo message: %s", message)
-        self.soc.send(message.encode())
+        frames = -(-len(self.message) // FRAME_SIZE)
+        if self.parser is not None:
+            self.transfer(message)
+            self.soc.close()
+            return
+        self.soc.send(self.message)
         logging.debug("sent first message")
-        for i in range(len(self.message)):
-            time.sleep(5)
-            self.receive_frame(i)
+        if self.window is not None:
+            self.receive_window(frames)
+        else:
+            for i in range(frames):
+                time.sleep(CAPTURE_DELAY)
+                self.receive_frame(i)
         self.soc.close()
 
+    def transfer(self, message: str):
+        # binary sessions stay open for further transfers until the client closes the socket
+        self.message = message.encode()
+        chunks = [self.message[i:i + CHUNK_SIZE] for i in range(0, len(self.message), CHUNK_SIZE)]
+        produced = self.compress(chunks)
+        self.soc.sendall(pack(BEGIN, len(self.message), 0))
+        _, buffer, _, _, _ = self.receive_binary()
+        logging.debug("streaming payload with upload buffer of %s bytes", buffer)
+        self.receive_binary_window(-(-len(self.payload) // self.block), buffer, chunks, produced)
+        if self.payload != self.message:
+            decompress = zlib.decompress if self.compression == 'zlib' else lzma.decompress
+            if decompress(self.payload) != self.message: raise ValueError("decompressed payload mismatch")
+        logging.info("Transfer complete, %s bytes in %s byte frames, flipped %s bits, corrected %s bits",
+                     len(self.message), len(self.payload), self.flipped, self.corrected)
+
+    def compress(self, chunks: List[bytes]) -> List[int]:
+        # mirror the compression of the session, returns the payload bytes displayed after each chunk is uploaded
+        self.payload = self.message
+        produced = list(itertools.accumulate(len(chunk) for chunk in chunks))
+        if self.compression is None or not chunks: return produced
+        if self.compression == 'zlib':
+            probe = zlib.compress(chunks[0], COMPRESSION_LEVEL)
+            stream = zlib.compressobj(COMPRESSION_LEVEL)
+        else:
+            probe = lzma.compress(chunks[0], preset=COMPRESSION_LEVEL)
+            stream = lzma.LZMACompressor(preset=COMPRESSION_LEVEL)
+        if len(probe) >= COMPRESSION_THRESHOLD * len(chunks[0]): return produced
+        out = [stream.compress(chunk) for chunk in chunks]
+        out[-1] += stream.flush()
+        self.payload = b''.join(out)
+        return list(itertools.accumulate(len(o) for o in out))
+
+    def ping(self, seq: int = 0):
+        self.soc.sendall(pack(PING, seq, 0))
+        kind, echo, _, _, _ = self.receive_binary()
+        if kind != PONG or echo != seq: raise ConnectionError
+        logging.debug("keepalive %s acknowledged", seq)
+
+    def frame(self, index: int) -> bytes:
+        block = self.payload[index * self.block:(index + 1) * self.block].ljust(self.block, b'\x00')
+        return block if self.fec is None else self.fec.encode(block)
+
+    def capture(self, index: int) -> bytes:
+        # simulated capture of a frame with bit errors at CAPTURE_BER, corrected if the session negotiated
+        # forward error correction
+        time.sleep(CAPTURE_DELAY)
+        frame = self.frame(index)
+        if CAPTURE_BER:
+            bits = np.unpackbits(np.frombuffer(frame, dtype=np.uint8))
+            errors = (np.random.random_sample(len(bits)) < CAPTURE_BER).astype(np.uint8)
+            self.flipped += int(errors.sum())
+            frame = np.packbits(bits ^ errors).tobytes()
+        if self.fec is None: return frame
+        block, corrected = self.fec.decode(frame)
+        self.corrected += corrected
+        return block
+
+    def receive_window(self, frames: int):
+        received = set()
+        expected = 0  # next in order frame
+        while expected < frames:
+            line = self.stream.readline()
+            logging.debug("recmsg: %s", line)
+            cached_crc = binascii.crc32(line)
+            crc, resp, seq = line.decode().strip().split('~')
+            seq = int(seq)
+            if resp != "UP": continue
+            time.sleep(CAPTURE_DELAY)
+            if int(crc) != binascii.crc32(self.frame(seq)):
+                self.send("{}~NACK~{}\n".format(cached_crc, seq))
+                continue
+            received.add(seq)
+            if seq != expected:
+                # out of order capture, acknowledge selectively
+                self.send("{}~SACK~{}\n".format(cached_crc, seq))
+                continue
+            while expected in received: expected += 1
+            self.send("{}~ACK~{}\n".format(cached_crc, seq))
+
+    def receive_binary(self) -> Tuple[int, int, int, bytes, bytes]:
+        while not self.messages:
+            data = self.soc.recv(4096)
+            if not data: raise ConnectionResetError
+            self.messages.extend(self.parser.feed(data))
+        return self.messages.pop(0)
+
+    def receive_binary_window(self, frames: int, buffer: int, chunks: List[bytes], produced: List[int]):
+        received = set()
+        expected = 0  # next in order frame
+        sent = 0  # chunks uploaded
+        while expected < frames:
+            # stream the payload at most buffer bytes ahead of the captured frames
+            while sent < len(chunks) and (produced[sent - 1] if sent else 0) - expected * self.block < buffer:
+                self.soc.sendall(pack(DATA, 0, binascii.crc32(chunks[sent]), chunks[sent]))
+                sent += 1
+            kind, seq, crc, _, raw = self.receive_binary()
+            logging.debug("recmsg: type %s seq %s crc %s", kind, seq, crc)
+            if kind != UP: continue
+            cached_crc = binascii.crc32(raw)
+            if crc != binascii.crc32(self.capture(seq)):
+                self.soc.sendall(pack(NACK, seq, cached_crc))
+                continue
+            received.add(seq)
+            if seq != expected:
+                # out of order capture, acknowledge selectively
+                self.soc.sendall(pack(SACK, seq, cached_crc))
+                continue
+            while expected in received: expected += 1
+            self.soc.sendall(pack(ACK, seq, cached_crc))
+
     def create_msg(self, crcval: int, msg: str) -> str:
         packet = str(crcval) + '~' + msg
         return packet
@@ -54,7 +286,7 @@ class Client:
         crc, resp, cached_crc = self.receive()
         # issue event to capture
         if resp == "UP":
-            crc_simulated_capture = binascii.crc32(self.message[index].encode())
+            crc_simulated_capture = binascii.crc32(self.frame(index))
             # note: replace samplecrc with captured crc
             logging.debug("captured crc: %s", crc_simulated_capture)
             # verify captured crc of data matches server sent crc
@@ -66,13 +298,34 @@ class Client:
 
 if __name__ == "__main__":
     args = sys.argv[1:]
+    # binary framing is requested with a --binary flag anywhere in the arguments
+    binary = '--binary' in args
+    if binary: args.remove('--binary')
+    # forward error correction with r parity bits per codeword, --fec=r, binary sessions only
+    fec = None
+    for arg in [a for a in args if a.startswith('--fec=')]:
+        fec = int(arg.split('=')[1])
+        args.remove(arg)
+    # simulated capture bit error rate, --ber=rate, binary sessions only
+    for arg in [a for a in args if a.startswith('--ber=')]:
+        CAPTURE_BER = float(arg.split('=')[1])
+        args.remove(arg)
+    # payload compression, --compress=zlib or --compress=lzma, binary sessions only
+    compress = None
+    for arg in [a for a in args if a.startswith('--compress=')]:
+        compress = arg.split('=')[1]
+        args.remove(arg)
     message = args[0]
     apr = args[1]
+    # optional number of frames in flight, omit for stop-and-wait
+    window = int(args[2]) if len(args) > 2 else None
     response = requests.get('http://localhost:5000/v1/register',
                             headers={'Content-Type': 'application/json', 'Apr': apr})
     payload: dict = json.loads(response.content)
     port = payload.get('port')
-    if port is None:
+    token = payload.get('token')
+    if port is None or token is None:
         raise RuntimeError
-    c = Client(host='localhost', port=port)
+    c = Client(host='localhost', port=port, token=token, window=window,
+               binary=binary or fec is not None or compress is not None, fec=fec, compress=compress)
     c.run(message)
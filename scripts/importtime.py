@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Import time benchmark of the tcs subsystems and the cli. Each target is imported in a fresh
+interpreter with `-X importtime` and the best cumulative time of several runs is reported, along with
+the third party packages it loaded.
+
+    ./scripts/importtime.py [runs]
+"""
+import sys
+import time
+import subprocess
+
+from typing import List, Tuple
+
+# modules imported by entry points, tests and health checks
+MODULES = [
+    'tcs',
+    'tcs.event.registry',
+    'tcs.metrics.registry',
+    'tcs.tcp.protocol',
+    'tcs.cache.cache',
+    'tcs.tcp.server',
+    'tcs.tcu.tcu',
+    'tcs.api.server',
+]
+# packages reported when a target loads them
+HEAVY = ('flask', 'serial', 'numpy', 'cacheout', 'yaml')
+
+
+def importtime(module: str) -> Tuple[float, List[str]]:
+    # cumulative import time of the module in seconds and the heavy packages it loaded
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+                            capture_output=True, text=True, check=True)
+    cumulative = 0
+    loaded = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line: continue
+        _, total, name = line.split('|')
+        if not total.strip().isdigit(): continue
+        name = name.strip()
+        if name == module: cumulative = int(total)
+        if name in HEAVY: loaded.append(name)
+    return cumulative / 1e6, loaded
+
+
+def cli(args: List[str]) -> float:
+    # wall time of a cli invocation in seconds
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'tcs'] + args, capture_output=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print("{:<24} {:>10}  {}".format('module', 'import ms', 'loads'))
+    for module in MODULES:
+        results = [importtime(module) for _ in range(runs)]
+        best = min(seconds for seconds, _ in results)
+        print("{:<24} {:>10.1f}  {}".format(module, best * 1e3, ' '.join(results[0][1]) or '-'))
+    for args in (['--version='], ['--help=']):
+        best = min(cli(args) for _ in range(runs))
+        print("{:<24} {:>10.1f}  wall".format('python3 -m tcs ' + args[0], best * 1e3))
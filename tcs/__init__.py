@@ -3,23 +3,38 @@ Transmission Control Software (TCS)
 ===================================
 Modified: 2021-06
 
-Initialization for the transmission software driver
+Initialization for the transmission software driver. Importing the package has no side effects,
+entry points call `configure` to set up logging before starting any subsystem. Logging is either
+written synchronously by the handlers of `config/log.yaml`, or queued to a background writer with the
+per frame loggers rate sampled as configured by `config/log_queue.yaml` (see `tcs.log`).
 
 Copyright © 2021 LEAP. All Rights Reserved.
 """
-import yaml
-import logging
-import logging.config
-
 from pathlib import Path
 
 
 # cleanup all previous logs for new runtime environment
 CONFIG_PATH = Path(__file__).parent.joinpath("config/log.yaml")
+QUEUE_CONFIG_PATH = Path(__file__).parent.joinpath("config/log_queue.yaml")
+
 
-# check for existance of config.yaml
-if not CONFIG_PATH.exists(): raise FileNotFoundError
+def configure(path: Path = CONFIG_PATH, queue: bool = False) -> None:
+    """
+    Configure logging from a yaml dict config
 
-# configure the logger
-with open(CONFIG_PATH) as file:
-    logging.config.dictConfig(yaml.full_load(file))
+    :param path: logging configuration
+    :type path: Path
+    :param queue: write the records of the configured handlers from a background thread
+    :type queue: bool
+    :raises FileNotFoundError: if the configuration does not exist
+    """
+    import yaml
+    import logging.config
+    # check for existance of config.yaml
+    if not path.exists(): raise FileNotFoundError(path)
+    # configure the logger
+    with open(path) as file:
+        logging.config.dictConfig(yaml.full_load(file))
+    if queue:
+        from tcs.log import listen
+        listen()
@@ -12,11 +12,17 @@ import getopt
 import logging
 import asyncio
 from threading import Thread
+from typing import TYPE_CHECKING, List
 
-from tcs.api.server import app as server
-from tcs.tcu.tcu import TransmissionControlUnit
+from tcs import CONFIG_PATH, QUEUE_CONFIG_PATH, configure
+from tcs.api.config import APIConfig as api
+from tcs.tcu.config import TCUConfig as tc
 from tcs.__version__ import __version__
 
+if TYPE_CHECKING:
+    from tcs.tcu.tcu import TransmissionControlUnit
+    from tcs.tcp.server import SessionServer
+
 
 def usage(exit_code: int) -> None:
     print("""
@@ -25,53 +31,113 @@ def usage(exit_code: int) -> None:
     Usage:
         python3 -m tcs -s /dev/ttyUSB0 -a 127.0.0.1:65432
         python3 -m tcs --serial-port /dev/ttyUSB0 --address 127.0.0.1:65432
+        python3 -m tcs -s /dev/ttyUSB0 -s /dev/ttyUSB1 -a 127.0.0.1:65432
+        python3 -m tcs -t loopback -a 127.0.0.1:65432
+        python3 -m tcs -s /dev/ttyUSB0 -a 127.0.0.1:65432 -w 16
+        python3 -m tcs -s /dev/ttyUSB0 -a 127.0.0.1:65432 -p
         python3 -m tcs --version=
         python3 -m tcs --help=
 
     Options:
         -h --help\t\t Show this screen.
         -v --version\t\t Show version.
-        -s --serial-port\t\t Set arduino serial port
+        -s --serial-port\t\t Set arduino serial port, repeat to drive several transmitters
+        -t --transmitter\t\t Set transmitter backend <serial|loopback|null> (default: serial)
         -a --address\t\t Set server address in <HOST:PORT> format
-    """)
+        -w --workers\t\t Set number of api worker threads (default: {})
+        -d --debug\t\t Serve the api with the flask debug server
+        -q --queue-log\t\t Write logs from a background thread and rate sample per frame logs
+        -p --payloads\t\t Compile and serve the payload directory, reloaded as it changes
+    """.format(api.WORKERS))
     sys.exit(exit_code)
 
 
+async def serve(tcus: List['TransmissionControlUnit'], sessions: 'SessionServer') -> None:
+    # one writer task per transmitter, receiver sessions are served on the same loop
+    await asyncio.gather(sessions.run(), *(tcu.run() for tcu in tcus))
+
+
 def main(argv: list) -> None:
-    serial = None
+    serial = []
+    backend = tc.DEFAULT_TRANSMITTER
     address = None
+    workers = api.WORKERS
+    debug = False
+    queue = False
+    payloads = False
     opts = []
     try:
-        opts, _ = getopt.getopt(argv, "s:a:h:v:", ["serial-port=", "address=", "help=", "version="])
+        opts, _ = getopt.getopt(argv, "s:t:a:w:dqph:v:",
+                                ["serial-port=", "transmitter=", "address=", "workers=", "debug", "queue-log",
+                                 "payloads", "help=", "version="])
     except getopt.GetoptError:
         print("command contained unexpected arguments")
         usage(exit_code=2)
     if opts == []: usage(exit_code=2)
     for opt, arg in opts:
         if opt in ("-s", "--serial-port"):
-            serial = arg
+            serial.append(arg)
+        elif opt in ("-t", "--transmitter"):
+            backend = arg
         elif opt in ("-a", "--address"):
             address = arg
+        elif opt in ("-w", "--workers"):
+            if not arg.isdigit() or int(arg) < 1:
+                print("workers must be a positive integer")
+                usage(exit_code=2)
+            workers = int(arg)
+        elif opt in ("-d", "--debug"):
+            debug = True
+        elif opt in ("-q", "--queue-log"):
+            queue = True
+        elif opt in ("-p", "--payloads"):
+            payloads = True
         elif opt in ("-v", "--version"):
             print("LEAP TCS version: {}".format(__version__))
             sys.exit(0)
         else:
             usage(exit_code=0)
 
-    _log.info("Initializing Transmission Control Unit")
-    if serial is None: tcu = TransmissionControlUnit()  # initialize tcu with default port
-    else: tcu = TransmissionControlUnit(serial)
+    configure(QUEUE_CONFIG_PATH if queue else CONFIG_PATH, queue)
+    _log = logging.getLogger(__name__)
+    # subsystems are imported once the options are parsed, --help and --version return without loading them
+    from tcs.api.server import app as server
+    from tcs.api.wsgi import PooledWSGIServer
+    from tcs.tcu import transmitter
+    from tcs.tcu.tcu import TransmissionControlUnit
+    from tcs.tcp.server import SessionServer
+
+    _log.info("Initializing Transmission Control Units")
+    try:
+        tcus = [TransmissionControlUnit(transmitter.create(backend, port), channel)
+                for channel, port in enumerate(serial or [''])]
+    except ValueError as exc:
+        print(exc)
+        usage(exit_code=2)
+
+    _log.info("Initializing Session Server")
+    sessions = SessionServer()
+
+    if payloads:
+        from tcs.file.catalog import PayloadCatalog
+        _log.info("Initializing Payload Catalog")
+        catalog = PayloadCatalog()
+        catalog.start()
+        # the api takes the current store of the catalog once per request
+        server.config['PAYLOAD_STORE'] = lambda: catalog.store
 
     _log.info("Initializing Server")
     # initialize socket
     host, port = address.split(':')  # Port to listen on (non-privileged ports are > 1023)
     port = int(port)
-    Thread(name="api", target=server.run, kwargs={'host': host, 'port': port,
-           'debug': True, 'use_reloader': False}, daemon=True).start()
-    asyncio.run(tcu.run())
+    if debug:
+        Thread(name="api", target=server.run, kwargs={'host': host, 'port': port,
+               'debug': True, 'use_reloader': False}, daemon=True).start()
+    else:
+        Thread(name="api", target=PooledWSGIServer(host, port, server, workers).serve_forever, daemon=True).start()
+    asyncio.run(serve(tcus, sessions))
 
 
 if __name__ == '__main__':
-    _log = logging.getLogger(__name__)
     # extract args from argument vector
     main(sys.argv[1:])
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Admission Control
+=================
+Modified: 2021-06
+
+Registration requests are admitted in two stages before any cache lookup. Global admission refuses
+every registration while the transmitters are saturated, judged by the queued payload bytes and the
+active receiver sessions. A token bucket per client address then limits how often each client may
+register. Refused requests carry the number of seconds to wait before retrying.
+
+Dependencies
+------------
+```
+import time
+from threading import Lock
+
+from cacheout import Cache
+
+from tcs.api.config import APIConfig as api
+from tcs.metrics.registry import Registry as metrics
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import time
+from threading import Lock
+
+from cacheout import Cache
+
+from tcs.api.config import APIConfig as api
+from tcs.metrics.registry import Registry as metrics
+
+
+class RateLimiter:
+
+    def __init__(self, rate: float = api.RATE_LIMIT, burst: int = api.RATE_BURST, clients: int = api.MAX_CLIENTS):
+        """
+        :param rate: requests per second allowed per client
+        :type rate: float
+        :param burst: requests a client may make at once
+        :type burst: int
+        :param clients: client buckets tracked at once
+        :type clients: int
+        """
+        self.rate = rate
+        self.burst = burst
+        # a bucket left alone this long is full again and can be forgotten
+        self._buckets = Cache(maxsize=clients, ttl=burst / rate)
+        self._lock = Lock()
+
+    def acquire(self, address: str) -> float:
+        """
+        Take a token from the bucket of a client
+
+        :param address: client address
+        :type address: str
+        :return: 0 if the request is admitted, otherwise the seconds until a token is available
+        :rtype: float
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.get(address, default=(self.burst, now))
+            tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+            if tokens >= 1:
+                self._buckets.set(address, (tokens - 1, now))
+                return 0.0
+            self._buckets.set(address, (tokens, now))
+        return (1 - tokens) / self.rate
+
+
+def overloaded() -> bool:
+    """
+    Whether the transmitters are too busy to admit new receivers
+    """
+    return metrics.queue_depth.value() > api.MAX_QUEUE_DEPTH or metrics.active_sessions.value() >= api.MAX_SESSIONS
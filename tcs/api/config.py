@@ -0,0 +1,16 @@
+class APIConfig:
+    # worker threads serving registration requests in production mode
+    WORKERS = 8
+    # pending connections queued by the listening socket
+    BACKLOG = 64
+    # apr keys accepted in a single batch registration
+    MAX_BATCH = 64
+    # registration requests per second and burst allowed per client address, and clients tracked at once
+    RATE_LIMIT = 2.0
+    RATE_BURST = 10
+    MAX_CLIENTS = 4096
+    # registrations are refused above this many queued payload bytes or active sessions
+    MAX_QUEUE_DEPTH = 1 << 16
+    MAX_SESSIONS = 64
+    # seconds overloaded clients are asked to wait before retrying
+    RETRY_AFTER = 5
@@ -1,10 +1,34 @@
-from threading import Thread
+import math
+import secrets
+from typing import TYPE_CHECKING
 from flask import Flask, request, abort, jsonify
 from flask.wrappers import Response
 from tcs.cache.cache import FrameCache
-from tcs.tcp.socket import SocketInterface
+from tcs.tcp.config import APConfig as ac
+from tcs.api.config import APIConfig as api
+from tcs.metrics.registry import Registry as metrics
+from tcs.tcp.status import SessionTable as sessions
+from tcs.tcp.server import SessionServer
+from tcs.api.admission import RateLimiter, overloaded
+
+if TYPE_CHECKING:
+    from tcs.file.store import FrameStore, StoreEntry
 
 app = Flask(__name__)
+limiter = RateLimiter()
+
+
+@app.before_request
+def admission() -> None:
+    # refuse registrations before any cache lookup when the tcs or the client is over its limit
+    if request.endpoint not in ('register', 'register_batch'): return
+    if overloaded():
+        metrics.rejections.labels(503).inc()
+        abort(503, retry_after=api.RETRY_AFTER)
+    wait = limiter.acquire(request.remote_addr)
+    if wait:
+        metrics.rejections.labels(429).inc()
+        abort(429, retry_after=math.ceil(wait))
 
 
 @app.route('/v1/register', methods=['GET'])
@@ -13,20 +37,93 @@ def register() -> Response:
     if apr_key is None:
         abort(400)
     with FrameCache() as fc:
-        result = fc.get(apr_key)
-    if not result:
+        ap = fc.get(apr_key)
+    if ap is None:
         abort(401)
-    # TODO: run random port selection on set of available ports
-    port = 6000
-    # start new socket connection
-    socket = SocketInterface(addr="localhost:{}".format(port))
-    Thread(name=apr_key, target=socket.run, args=(), daemon=True).start()
+    # hand the receiver over to the session server
+    token = secrets.token_hex(ac.TOKEN_BYTES)
+    SessionServer.issue(token, ap)
     payload = {
-        'port': port
+        'port': int(ac.SESSION_ADDR.split(':')[1]),
+        'token': token
     }
     return jsonify(payload)
 
 
+@app.route('/v1/register/batch', methods=['POST'])
+def register_batch() -> Response:
+    body = request.get_json(silent=True)
+    apr_keys = body.get('apr') if isinstance(body, dict) else None
+    if not isinstance(apr_keys, list) or not 0 < len(apr_keys) <= api.MAX_BATCH:
+        abort(400)
+    if not all(isinstance(apr_key, str) for apr_key in apr_keys):
+        abort(400)
+    with FrameCache() as fc:
+        aps = fc.get_many(apr_keys)
+    results = []
+    for apr_key in apr_keys:
+        # a key resolves a single session, repeated keys are unauthorized
+        ap = aps.pop(apr_key, None)
+        if ap is None:
+            results.append({'apr': apr_key, 'message': 'unauthorized'})
+            continue
+        token = secrets.token_hex(ac.TOKEN_BYTES)
+        SessionServer.issue(token, ap)
+        results.append({'apr': apr_key, 'token': token})
+    payload = {
+        'port': int(ac.SESSION_ADDR.split(':')[1]),
+        'results': results
+    }
+    return jsonify(payload)
+
+
+@app.route('/v1/sessions', methods=['GET'])
+def session_list() -> Response:
+    return jsonify({'sessions': sessions.snapshot()})
+
+
+@app.route('/v1/sessions/<int:session_id>', methods=['GET'])
+def session_status(session_id: int) -> Response:
+    status = sessions.get(session_id)
+    if status is None:
+        abort(404)
+    return jsonify(status.snapshot())
+
+
+@app.route('/v1/payloads', methods=['GET'])
+def payload_list() -> Response:
+    store = _payload_store()
+    return jsonify({'payloads': [_payload_entry(entry) for entry in store.entries.values()]})
+
+
+@app.route('/v1/payloads/<name>', methods=['GET'])
+def payload_status(name: str) -> Response:
+    entry = _payload_store().entries.get(name)
+    if entry is None:
+        abort(404)
+    return jsonify(_payload_entry(entry))
+
+
+def _payload_store() -> 'FrameStore':
+    # the entry point registers the store lookup of its payload catalog, take the store once per request
+    lookup = app.config.get('PAYLOAD_STORE')
+    if lookup is None:
+        abort(404)
+    store = lookup()
+    if store is None:
+        abort(503, retry_after=api.RETRY_AFTER)
+    return store
+
+
+def _payload_entry(entry: 'StoreEntry') -> dict:
+    return {'name': entry.name, 'size': entry.size, 'modified': entry.mtime / 1e9, 'frames': entry.count}
+
+
+@app.route('/v1/metrics', methods=['GET'])
+def metrics_exposition() -> Response:
+    return Response(metrics.exposition(), mimetype='text/plain; version=0.0.4')
+
+
 @app.errorhandler(400)
 def bad_request(_):
     response = jsonify({'message': 'bad request'})
@@ -39,3 +136,26 @@ def unauthorized(_):
     response = jsonify({'message': 'unauthorized'})
     response.status_code = 401
     return response
+
+
+@app.errorhandler(404)
+def not_found(_):
+    response = jsonify({'message': 'not found'})
+    response.status_code = 404
+    return response
+
+
+@app.errorhandler(429)
+def too_many_requests(error):
+    response = jsonify({'message': 'too many requests'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+@app.errorhandler(503)
+def service_unavailable(error):
+    response = jsonify({'message': 'service unavailable'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+API Server
+==========
+Modified: 2021-06
+
+Production WSGI server for the registration API. Requests are accepted on the serving thread and
+handled by a fixed pool of worker threads, so concurrent receivers register in parallel with a
+bounded number of threads. The server runs in the TCS process, next to the `FrameCache` and the
+session server it hands receivers over to.
+
+Dependencies
+------------
+```
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+from typing import Callable
+
+from tcs.api.config import APIConfig as api
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+from typing import Callable
+
+from tcs.api.config import APIConfig as api
+
+
+class RequestHandler(WSGIRequestHandler):
+
+    def log_message(self, format: str, *args) -> None:
+        logging.getLogger(__name__).debug("%s - %s", self.address_string(), format % args)
+
+
+class PooledWSGIServer(WSGIServer):
+    request_queue_size = api.BACKLOG
+
+    def __init__(self, host: str, port: int, app: Callable, workers: int = api.WORKERS):
+        """
+        :param host: interface to listen on
+        :type host: str
+        :param port: port to listen on
+        :type port: int
+        :param app: WSGI application
+        :type app: Callable
+        :param workers: number of worker threads handling requests
+        :type workers: int
+        :raises ValueError: if `workers` is less than 1
+        """
+        if workers < 1: raise ValueError("at least one api worker is required")
+        self._log = logging.getLogger(__name__)
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+        super().__init__((host, port), RequestHandler)
+        self.set_app(app)
+
+    def process_request(self, request, client_address) -> None:
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        self._log.info("Serving api on %s:%s with %s workers", *self.server_address[:2], self.workers)
+        super().serve_forever(poll_interval)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=False)
@@ -9,23 +9,59 @@ Dependancies
 ```
 import logging
 import hashlib
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Iterable, NamedTuple, Optional, Union
 
-from cacheout import FIFOCache
+from tcs.log import Hex
+from tcs.metrics.registry import Registry as metrics
+
+if TYPE_CHECKING:
+    from cacheout import FIFOCache, RemovalCause
 ```
 Copyright © 2021 LEAP. All Rights Reserved.
 """
 import logging
 import hashlib
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Iterable, NamedTuple, Optional, Union
+
+from tcs.log import Hex
+from tcs.metrics.registry import Registry as metrics
+
+if TYPE_CHECKING:
+    from cacheout import FIFOCache, RemovalCause
+
+
+class AccessPoint(NamedTuple):
+    """Location of a receiver: the transmitter channel and the access point it captured from"""
+    channel: int
+    index: int
 
-from cacheout import FIFOCache
+
+def _removed(_key: str, _value: AccessPoint, cause: 'RemovalCause') -> None:
+    # only called once the cache has been created, cacheout is already imported
+    from cacheout import RemovalCause
+    if cause is RemovalCause.EXPIRED: metrics.cache_expiries.inc()
+    elif cause is RemovalCause.FULL: metrics.cache_evictions.inc()
 
 
 class FrameCache:
 
-    _cache = FIFOCache(maxsize=256, ttl=10)
+    # each transmitted frame posts one digest per access point
+    _cache: Optional['FIFOCache'] = None
+    _lock = Lock()
 
     def __init__(self) -> None:
         self._log = logging.getLogger(__name__)
+        if FrameCache._cache is None: self._create()
+
+    @classmethod
+    def _create(cls) -> None:
+        # the tcu and api threads may both make the first lookup
+        with cls._lock:
+            if cls._cache is not None: return
+            from cacheout import FIFOCache
+            cls._cache = FIFOCache(maxsize=1024, ttl=10, on_delete=_removed)
 
     def __enter__(self):
         return self
@@ -33,24 +69,42 @@ class FrameCache:
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         pass
 
-    def post(self, bytestream: bytes) -> None:
+    def post(self, bytestream: Union[bytes, memoryview], channel: int = 0, ap: int = 0) -> None:
         # apply md5 hash to bytestream and save to cache for lookup
         md5_digest = hashlib.md5(bytestream).hexdigest()
-        self._log.info("computed md5 digest: %s -> %s", bytestream, md5_digest)
+        self._log.info("computed md5 digest: %s -> %s", Hex(bytestream), md5_digest)
         # set frame to fifo cache
-        ap = 0  # TODO: add multidirectional access point cache
-        self._cache.set(md5_digest, ap)
+        self._cache.set(md5_digest, AccessPoint(channel, ap))
         self._log.info("set frame to cache")
 
-    def get(self, md5_digest: str) -> bool:
+    def get(self, md5_digest: str) -> Optional[AccessPoint]:
         result = self._cache.get(md5_digest)
-        if result is None:
+        # autoclear discovered element, only the caller that removes it is granted the access point
+        if result is None or self._cache.delete(md5_digest) != 1:
+            metrics.cache_misses.inc()
             self._log.info("cache digest: %s expired or does not exist.", md5_digest)
-            return False
-        # autoclear discovered element
-        self._cache.delete(md5_digest)
+            return None
+        metrics.cache_hits.inc()
         self._log.info("cache digest: %s discovered at access point: %s and removed.", md5_digest, result)
-        return True
+        return result
+
+    def get_many(self, md5_digests: Iterable[str]) -> Dict[str, AccessPoint]:
+        """
+        Look up several digests in one pass over the cache, removing every digest discovered
+
+        :param md5_digests: digests to look up
+        :type md5_digests: Iterable[str]
+        :return: access point of each digest discovered, expired or unknown digests are omitted
+        :rtype: Dict[str, AccessPoint]
+        """
+        digests = list(dict.fromkeys(md5_digests))
+        # autoclear discovered elements, only the caller that removes a digest is granted its access point
+        results = {digest: ap for digest, ap in self._cache.get_many(digests).items()
+                   if self._cache.delete(digest) == 1}
+        metrics.cache_hits.inc(len(results))
+        metrics.cache_misses.inc(len(digests) - len(results))
+        self._log.info("cache discovered %s of %s digests and removed them.", len(results), len(digests))
+        return results
 
     def clear(self) -> None:
         self._cache.clear()
@@ -7,16 +7,22 @@ Modified: 2021-06
 Dependencies
 ------------
 ```
+import time
 import logging
 import asyncio
 from typing import Any, Callable, Coroutine, Generic, TypeVar
+
+from tcs.metrics.registry import Registry as metrics
 ```
 Copyright © 2020 LEAP. All Rights Reserved.
 """
+import time
 import logging
 import asyncio
 from typing import Any, Callable, Coroutine, Generic, TypeVar
 
+from tcs.metrics.registry import Registry as metrics
+
 _T = TypeVar('_T', bound=Callable[..., Coroutine[Any, Any, None]])
 
 
@@ -25,6 +31,7 @@ class Event(Generic[_T]):
         self.log = logging.getLogger(__name__)
         self.event_id = event_id
         self._registry = list()
+        self._latency = metrics.dispatch_latency.labels(event_id)
 
     def __repr__(self) -> str:
         """
@@ -43,12 +50,21 @@ class Event(Generic[_T]):
         tasks = [func(*args, **kwargs) for func in self._registry]
         asyncio.run(self._worker(*tasks))
 
+    async def dispatch(self, *args, **kwargs) -> None:
+        """
+        Execute the event queue on the running event loop. Used by callers that are already
+        running inside a coroutine where `execute` cannot start a new loop.
+        """
+        await self._worker(*(func(*args, **kwargs) for func in self._registry))
+
     async def _worker(self, *tasks) -> None:
         """
         Asynchronous dispatcher for event functions. Catch all exceptions and return report
         """
         self.log.info("Dispatched %s", self.event_id)
+        start = time.perf_counter()
         results = await asyncio.gather(*tasks, return_exceptions=True)
+        self._latency.observe(time.perf_counter() - start)
         # log any exceptions TODO: link exceptions to specific subscriber callbacks
         self.log.info("Event dispatch results: %s", results)
 
@@ -7,18 +7,24 @@ Modified: 2021-06
 Dependencies
 ------------
 ```
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, Tuple
 from tcs.event.event import Event
 ```
 Copyright © 2021 LEAP. All Rights Reserved.
 """
 
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, Tuple
 from tcs.event.event import Event
 
 
 class Registry:
     shutdown = Event[Callable[[], Coroutine[Any, Any, None]]]('shutdown')
-    transmit = Event[Callable[[bytes], Coroutine[Any, Any, None]]]('transmit')
-    enqueue = Event[Callable[[bytes], Coroutine[Any, Any, None]]]('enqueue')
-    uplink = Event[Callable[[], Coroutine[Any, Any, None]]]('uplink')
+    transmit = Event[Callable[[bytes, int, int], Coroutine[Any, Any, None]]]('transmit')
+    # payload, the (channel, access point) and id of the receiving session
+    enqueue = Event[Callable[[bytes, Tuple[int, int], int], Coroutine[Any, Any, None]]]('enqueue')
+    # channel, session id and the number of frame credits the session grants to the tcu
+    uplink = Event[Callable[[int, int, int], Coroutine[Any, Any, None]]]('uplink')
+    # (channel, access point) and id of a closed session, its queued frames and credits are released
+    release = Event[Callable[[Tuple[int, int], int], Coroutine[Any, Any, None]]]('release')
+    # (channel, access point), session id and the retransmission rate of the session
+    feedback = Event[Callable[[Tuple[int, int], int, float], Coroutine[Any, Any, None]]]('feedback')
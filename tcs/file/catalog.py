@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Payload Catalog
+===============
+Modified: 2021-06
+
+The `PayloadCatalog` keeps the frame store of the payload directory up to date while the tcs runs.
+A background worker polls the directory every `FileConfig.POLL_INTERVAL` seconds and compares the
+size and mtime of each file with the signatures in the store. Once a file is added, changed or
+removed the store is recompiled, encoding only the files that changed, and the catalog swaps to the
+new store in a single assignment. A missing payload directory is created when the catalog starts,
+the catalog is empty until payloads are moved into it.
+
+Readers take `catalog.store` once per lookup and see either the previous or the new store, never a
+mix of both. A previous store is unmapped once its last reader releases it.
+
+The compiler reads payload files rather than mapping them, a file truncated or rewritten while it
+is compiled is picked up again by a later compile. Payloads served through a memory mapped
+`PayloadFile` are not protected however: truncating a mapped file raises SIGBUS on the next access
+to the lost pages, which kills the tcs. Payloads must be replaced by moving the new file into place,
+never rewritten in place.
+
+Dependencies
+------------
+```
+import os
+import logging
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Dict, Optional, Tuple, Union
+
+from tcs.file.config import FileConfig as fc
+from tcs.file.parser import payloads
+from tcs.file.store import FrameStore, compile_store
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import os
+import logging
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Dict, Optional, Tuple, Union
+
+from tcs.file.config import FileConfig as fc
+from tcs.file.parser import payloads
+from tcs.file.store import FrameStore, compile_store
+
+
+class PayloadCatalog:
+
+    def __init__(self, directory: Union[str, Path] = fc.PAYLOAD_DIR, path: Union[str, Path] = fc.STORE_PATH,
+                 interval: float = fc.POLL_INTERVAL):
+        """
+        :param directory: payload directory
+        :type directory: Union[str, Path]
+        :param path: frame store compiled from the directory, reused if it exists
+        :type path: Union[str, Path]
+        :param interval: seconds between polls of the directory
+        :type interval: float
+        """
+        self._log = logging.getLogger(__name__)
+        self.directory = Path(directory)
+        self.path = Path(path)
+        self.interval = interval
+        self.reloads = 0
+        self._stopped = Event()
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+        # store served to readers, None until the directory has been compiled
+        self.store: Optional[FrameStore] = None
+        try:
+            self.store = FrameStore(self.path)
+        except (OSError, ValueError) as exc:
+            self._log.info("No frame store to resume from at %s: %s", self.path, exc)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def signatures(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Size and mtime in ns of each file in the payload directory
+
+        :raises FileNotFoundError: if the directory does not exist
+        """
+        signatures = {}
+        for path in payloads(self.directory):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # removed since the directory was listed
+            signatures[path.name] = stat.st_size, stat.st_mtime_ns
+        return signatures
+
+    def refresh(self) -> bool:
+        """
+        Recompile the store if the payload directory has changed since it was compiled
+
+        :raises OSError: if the directory cannot be read or the store cannot be written
+        :return: whether the catalog swapped to a new store
+        :rtype: bool
+        """
+        with self._lock:
+            current = self.store
+            if current is not None and current.signatures() == self.signatures(): return False
+            compile_store(self.directory, self.path, previous=current)
+            # single assignment, readers see the previous or the new store
+            self.store = FrameStore(self.path)
+        self.reloads += 1
+        self._log.info("Payload catalog reloaded with %s files", len(self.store))
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None: return
+        if not self.directory.is_dir():
+            try:
+                self.directory.mkdir(parents=True)
+                self._log.info("Created payload directory %s", self.directory)
+            except OSError as exc:
+                self._log.warning("Failed to create payload directory %s: %s", self.directory, exc)
+        self._stopped.clear()
+        self._thread = Thread(name="catalog", target=self._poll, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None: return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _poll(self) -> None:
+        missing = False
+        while True:
+            try:
+                self.refresh()
+                missing = False
+            except FileNotFoundError as exc:
+                # reported once, the catalog is reloaded once the directory exists again
+                if not missing: self._log.warning("Payload directory %s not found: %s", self.directory, exc)
+                missing = True
+            except OSError as exc:
+                self._log.exception("Failed to reload payload catalog from %s: %s", self.directory, exc)
+            if self._stopped.wait(self.interval): return
@@ -0,0 +1,16 @@
+import os
+from pathlib import Path
+
+
+class FileConfig:
+    """Payload file constants class"""
+    # directory of the payload files served to receivers, relative paths are resolved against this package
+    PAYLOAD_DIR = Path(__file__).parent.joinpath(os.environ.get('PAYLOAD_DIR', 'payload'))
+    # frame store compiled from the payload directory
+    STORE_PATH = PAYLOAD_DIR.with_name(PAYLOAD_DIR.name + '.frames')
+    # frames segmented and encoded at once by the compiler
+    COMPILE_CHUNK = 1 << 16
+    # compiles restarted when a payload changes while it is compiled
+    COMPILE_RETRIES = 3
+    # seconds between polls of the payload directory for changes
+    POLL_INTERVAL = 2
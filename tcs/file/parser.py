@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Payload Parser
+==============
+Modified: 2021-06
+
+Payload files of any type are memory mapped and read as frames of dim³ bits. Frames are zero-copy
+`memoryview` slices of the mapping, only the final frame is copied to pad it with null bytes, so
+the memory used by a payload stays flat regardless of its size and pages are read from disk as the
+frames are transmitted. The whole payload can also be queued on a `FrameQueue` as a single view.
+
+Views of a payload must be released before it is closed, a payload closed while views remain is
+unmapped once they are garbage collected. A mapped file must not be truncated: reading a frame past
+the new end of the file raises SIGBUS and kills the process. Replace payloads by moving the new file
+into place instead.
+
+Dependencies
+------------
+```
+import os
+import mmap
+import logging
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+from tcs.tcu.config import TCUConfig as tc
+from tcs.file.config import FileConfig as fc
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import os
+import mmap
+import logging
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+from tcs.tcu.config import TCUConfig as tc
+from tcs.file.config import FileConfig as fc
+
+
+class PayloadFile:
+
+    def __init__(self, path: Union[str, Path], frame_size: int = tc.FRAME_SIZE):
+        """
+        :param path: payload file
+        :type path: Union[str, Path]
+        :param frame_size: bytes per frame
+        :type frame_size: int
+        :raises OSError: if the file cannot be opened or mapped
+        """
+        self._log = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.frame_size = frame_size
+        self._map: Optional[mmap.mmap] = None
+        with open(self.path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            self.size = stat.st_size
+            self.mtime = stat.st_mtime_ns
+            # empty files cannot be mapped and carry no frames
+            if self.size: self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._log.debug("Mapped payload %s of %s bytes in %s frames", self.path, self.size, len(self))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """
+        Number of frames in the payload
+
+        :return: frame count
+        :rtype: int
+        """
+        return -(-self.size // self.frame_size)
+
+    def __repr__(self) -> str:
+        return "PayloadFile({}, {} bytes)".format(self.path, self.size)
+
+    def view(self) -> memoryview:
+        """
+        Zero-copy view of the whole payload, the final frame is not padded
+        """
+        return memoryview(self._map) if self._map is not None else memoryview(b'')
+
+    def frame(self, index: int) -> memoryview:
+        """
+        Frame of the payload by index
+
+        :param index: frame index
+        :type index: int
+        :raises IndexError: if the payload has no frame at `index`
+        :return: view of `frame_size` bytes
+        :rtype: memoryview
+        """
+        if not 0 <= index < len(self): raise IndexError("payload has {} frames".format(len(self)))
+        start = index * self.frame_size
+        if start + self.frame_size <= self.size: return memoryview(self._map)[start:start + self.frame_size]
+        # pad the final frame with null bytes
+        return memoryview(self._map[start:].ljust(self.frame_size, b'\x00'))
+
+    def frames(self) -> Iterator[memoryview]:
+        """
+        Frames of the payload in order, read lazily from the mapping
+
+        :return: views of `frame_size` bytes
+        :rtype: Iterator[memoryview]
+        """
+        if self._map is None: return
+        view = memoryview(self._map)
+        whole = self.size - self.size % self.frame_size
+        try:
+            for start in range(0, whole, self.frame_size):
+                yield view[start:start + self.frame_size]
+        finally:
+            view.release()
+        if whole < self.size: yield memoryview(self._map[whole:].ljust(self.frame_size, b'\x00'))
+
+    def close(self) -> None:
+        if self._map is None: return
+        try:
+            self._map.close()
+        except BufferError:
+            self._log.debug("Payload %s has views outstanding, it is unmapped once they are released", self.path)
+        self._map = None
+
+
+def payloads(directory: Union[str, Path] = fc.PAYLOAD_DIR) -> List[Path]:
+    """
+    Payload files in a directory, sorted by name. Hidden files and subdirectories are skipped.
+
+    :param directory: payload directory
+    :type directory: Union[str, Path]
+    :raises FileNotFoundError: if the directory does not exist
+    :return: paths of the payload files
+    :rtype: List[Path]
+    """
+    with os.scandir(directory) as entries:
+        return sorted(Path(entry.path) for entry in entries
+                      if entry.is_file() and not entry.name.startswith('.'))
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Frame Store
+===========
+Modified: 2021-06
+
+Segmenting, checksumming and encoding a payload is deterministic, so the payload directory is
+compiled once into a frame store file which is served by memory mapping it. Looking up a payload
+and any of its frames is then O(1) regardless of its size.
+
+A store holds a header, an index of the payload files and three data sections starting on a page
+boundary:
+```
+header      magic, version, cube dimension, access points, files, frames, offset of the data
+index       per file: first frame, frame count, source size, source mtime (ns), name
+frames      every frame of every file in order, the final frame of each file padded with null bytes
+crcs        crc32 of each frame
+hardware    each frame in its hardware mapped form for every access point
+```
+The size and mtime of each source file are kept as its signature, so a store can tell which files
+have changed since it was compiled. A store recompiled from a previous one copies the sections of
+the files whose signature is unchanged instead of encoding them again. Stores are written to a
+temporary file and moved into place, readers never see a partially written store.
+
+Source files are read in chunks rather than memory mapped, so a payload truncated while it is being
+compiled cannot fault the compiler. Each file is checked against the signature it was indexed with
+before and after it is encoded, a file that changed in between is not stored and the compile is
+retried up to `FileConfig.COMPILE_RETRIES` times.
+
+Dependencies
+------------
+```
+import os
+import mmap
+import struct
+import logging
+import binascii
+from pathlib import Path
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcu.codec import ACCESS_POINTS, SpatialCodec
+from tcs.file.config import FileConfig as fc
+from tcs.file.parser import payloads
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import os
+import mmap
+import struct
+import logging
+import binascii
+from pathlib import Path
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcu.codec import ACCESS_POINTS, SpatialCodec
+from tcs.file.config import FileConfig as fc
+from tcs.file.parser import payloads
+
+MAGIC = b'LFS\x00'
+VERSION = 1
+# magic, version, cube dimension, access points, files, frames, offset of the data sections
+HEADER = struct.Struct('!4sBBBxIQQ')
+# first frame, frame count, source size, source mtime in ns, name length
+ENTRY = struct.Struct('!QQQqH')
+CRC = struct.Struct('!I')
+
+
+class StoreEntry(NamedTuple):
+    """Payload file in a frame store"""
+    name: str
+    size: int
+    mtime: int
+    first: int
+    count: int
+
+
+class FrameStore:
+
+    def __init__(self, path: Union[str, Path] = fc.STORE_PATH, dim: int = tc.DIM):
+        """
+        :param path: frame store file
+        :type path: Union[str, Path]
+        :param dim: cube dimension the store must be compiled for
+        :type dim: int
+        :raises OSError: if the store cannot be opened or mapped
+        :raises ValueError: if the file is not a frame store for `dim`
+        """
+        self._log = logging.getLogger(__name__)
+        self.path = Path(path)
+        with open(self.path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self.dim, self.access_points, files, self.frame_count, data = \
+                HEADER.unpack_from(self._map)
+        except struct.error:
+            magic, version = b'', 0
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError("{} is not a version {} frame store".format(self.path, VERSION))
+        if self.dim != dim:
+            self._map.close()
+            raise ValueError("{} was compiled for cube dimension {}".format(self.path, self.dim))
+        self.frame_size = pow(self.dim, 3) // 8
+        self.entries: Dict[str, StoreEntry] = {}
+        offset = HEADER.size
+        for _ in range(files):
+            first, count, size, mtime, length = ENTRY.unpack_from(self._map, offset)
+            offset += ENTRY.size
+            name = self._map[offset:offset + length].decode()
+            offset += length
+            self.entries[name] = StoreEntry(name, size, mtime, first, count)
+        self._frames = data
+        self._crcs = self._frames + self.frame_count * self.frame_size
+        self._hardware = self._crcs + self.frame_count * CRC.size
+        self._view = memoryview(self._map)
+        self._log.info("Opened frame store %s of %s files in %s frames", self.path, files, self.frame_count)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def frames(self, name: str) -> memoryview:
+        """
+        Zero-copy view of the frames of a payload, the final frame is padded
+
+        :param name: payload file name
+        :type name: str
+        :raises KeyError: if the payload is not in the store
+        :return: `count` frames of `frame_size` bytes
+        :rtype: memoryview
+        """
+        entry = self.entries[name]
+        start = self._frames + entry.first * self.frame_size
+        return self._view[start:start + entry.count * self.frame_size]
+
+    def frame(self, name: str, index: int) -> memoryview:
+        """
+        Zero-copy view of a frame of a payload, the final frame is padded
+
+        :param name: payload file name
+        :type name: str
+        :param index: frame index within the payload
+        :type index: int
+        :raises KeyError: if the payload is not in the store
+        :raises IndexError: if the payload has no frame at `index`
+        :return: view of `frame_size` bytes
+        :rtype: memoryview
+        """
+        start = self._frames + self._index(name, index) * self.frame_size
+        return self._view[start:start + self.frame_size]
+
+    def crc(self, name: str, index: int) -> int:
+        """
+        crc32 of a frame of a payload
+
+        :raises KeyError: if the payload is not in the store
+        :raises IndexError: if the payload has no frame at `index`
+        """
+        return CRC.unpack_from(self._map, self._crcs + self._index(name, index) * CRC.size)[0]
+
+    def hardware(self, name: str, index: int, ap: int) -> memoryview:
+        """
+        Hardware mapped form of a frame of a payload encoded for an access point
+
+        :raises KeyError: if the payload is not in the store
+        :raises IndexError: if the payload has no frame at `index` or the access point is unknown
+        """
+        if not 0 <= ap < self.access_points: raise IndexError("store has {} access points".format(self.access_points))
+        start = self._hardware + (self._index(name, index) * self.access_points + ap) * self.frame_size
+        return self._view[start:start + self.frame_size]
+
+    def signatures(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Size and mtime in ns of the source of each payload when the store was compiled
+        """
+        return {entry.name: (entry.size, entry.mtime) for entry in self.entries.values()}
+
+    def _sections(self, name: str) -> Tuple[memoryview, memoryview, memoryview]:
+        # frames, crcs and hardware mapped frames of a payload
+        entry = self.entries[name]
+        crcs = self._crcs + entry.first * CRC.size
+        hardware = self._hardware + entry.first * self.access_points * self.frame_size
+        return (self.frames(name), self._view[crcs:crcs + entry.count * CRC.size],
+                self._view[hardware:hardware + entry.count * self.access_points * self.frame_size])
+
+    def _index(self, name: str, index: int) -> int:
+        # store wide index of a frame of a payload
+        entry = self.entries[name]
+        if not 0 <= index < entry.count: raise IndexError("{} has {} frames".format(name, entry.count))
+        return entry.first + index
+
+    def close(self) -> None:
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            self._log.debug("Frame store %s has views outstanding, it is unmapped once they are released", self.path)
+
+
+def compile_store(directory: Union[str, Path] = fc.PAYLOAD_DIR, path: Union[str, Path] = fc.STORE_PATH,
+                  dim: int = tc.DIM, previous: Optional[FrameStore] = None) -> List[StoreEntry]:
+    """
+    Compile the payload files of a directory into a frame store. Files unchanged since `previous`
+    was compiled are copied from it rather than encoded again.
+
+    :param directory: payload directory
+    :type directory: Union[str, Path]
+    :param path: frame store file, replaced atomically once compiled
+    :type path: Union[str, Path]
+    :param dim: cube dimension of the transmitters
+    :type dim: int
+    :param previous: store previously compiled from the directory
+    :type previous: Optional[FrameStore]
+    :raises FileNotFoundError: if the directory does not exist
+    :raises OSError: if a payload cannot be read, keeps changing while it is compiled or the store
+        cannot be written
+    :return: index of the store
+    :rtype: List[StoreEntry]
+    """
+    for _ in range(fc.COMPILE_RETRIES):
+        entries = _compile_store(Path(directory), Path(path), dim, previous)
+        if entries is not None: return entries
+    raise OSError("payloads in {} kept changing while they were compiled".format(directory))
+
+
+def _compile_store(directory: Path, path: Path, dim: int, previous: Optional[FrameStore]) -> Optional[List[StoreEntry]]:
+    # compile the store, None if a payload changed while it was compiled
+    log = logging.getLogger(__name__)
+    frame_size = pow(dim, 3) // 8
+    codec = SpatialCodec(dim, tc.HARDWARE_MAPS[dim])
+    signatures = previous.signatures() if previous is not None and previous.dim == dim else {}
+    reused = 0
+    entries = []
+    first = 0
+    for source in payloads(directory):
+        try:
+            stat = os.stat(source)
+        except FileNotFoundError:
+            continue  # removed since the directory was listed
+        count = -(-stat.st_size // frame_size)
+        entries.append(StoreEntry(source.name, stat.st_size, stat.st_mtime_ns, first, count))
+        first += count
+    index = b''.join(ENTRY.pack(e.first, e.count, e.size, e.mtime, len(e.name.encode())) + e.name.encode()
+                     for e in entries)
+    # data sections start on a page boundary
+    data = -(-(HEADER.size + len(index)) // mmap.ALLOCATIONGRANULARITY) * mmap.ALLOCATIONGRANULARITY
+    crcs = data + first * frame_size
+    hardware = crcs + first * CRC.size
+    end = hardware + first * ACCESS_POINTS * frame_size
+    temporary = path.with_name(path.name + '.tmp')
+    try:
+        with open(temporary, 'w+b') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, dim, ACCESS_POINTS, len(entries), first, data) + index)
+            file.truncate(end)
+            if first:
+                with mmap.mmap(file.fileno(), end) as store:
+                    for entry in entries:
+                        if signatures.get(entry.name) != (entry.size, entry.mtime):
+                            if _compile(store, directory / entry.name, entry, codec, data, crcs, hardware): continue
+                            log.warning("Payload %s changed while it was compiled, recompiling", entry.name)
+                            return None
+                        frames, checksums, encoded = previous._sections(entry.name)
+                        store[data + entry.first * frame_size:data + entry.first * frame_size + len(frames)] = frames
+                        store[crcs + entry.first * CRC.size:crcs + entry.first * CRC.size + len(checksums)] = checksums
+                        offset = hardware + entry.first * ACCESS_POINTS * frame_size
+                        store[offset:offset + len(encoded)] = encoded
+                        reused += 1
+                    store.flush()
+        os.replace(temporary, path)
+    finally:
+        if temporary.exists(): temporary.unlink()
+    log.info("Compiled %s payload files in %s frames to %s, %s unchanged files reused", len(entries), first, path,
+             reused)
+    return entries
+
+
+def _compile(store: mmap.mmap, source: Path, entry: StoreEntry, codec: SpatialCodec,
+             data: int, crcs: int, hardware: int) -> bool:
+    # segment, checksum and encode a payload into the sections of a store a chunk of frames at a time,
+    # False if the file no longer matches the signature it was indexed with
+    frame_size = codec.frame_bits // 8
+    try:
+        file = open(source, 'rb', buffering=0)
+    except FileNotFoundError:
+        return False
+    with file:
+        if _signature(file) != (entry.size, entry.mtime): return False
+        buffer = memoryview(bytearray(min(fc.COMPILE_CHUNK, entry.count) * frame_size))
+        remaining = entry.size
+        for start in range(0, entry.count, fc.COMPILE_CHUNK):
+            count = min(fc.COMPILE_CHUNK, entry.count - start)
+            size = min(count * frame_size, remaining)
+            read = 0
+            while read < size:
+                n = file.readinto(buffer[read:size])
+                if not n: return False  # truncated
+                read += n
+            remaining -= size
+            chunk = bytes(buffer[:size]).ljust(count * frame_size, b'\x00')
+            frame = entry.first + start
+            store[data + frame * frame_size:data + (frame + count) * frame_size] = chunk
+            checksums = b''.join(CRC.pack(binascii.crc32(chunk[i:i + frame_size]))
+                                 for i in range(0, len(chunk), frame_size))
+            store[crcs + frame * CRC.size:crcs + (frame + count) * CRC.size] = checksums
+            encoded = np.stack([np.frombuffer(codec.hardware(chunk, ap), dtype=np.uint8).reshape(count, frame_size)
+                                for ap in range(ACCESS_POINTS)], axis=1)
+            offset = hardware + frame * ACCESS_POINTS * frame_size
+            store[offset:offset + encoded.size] = encoded.tobytes()
+        # a file rewritten in place while it was read may have kept its size but not its mtime
+        return _signature(file) == (entry.size, entry.mtime)
+
+
+def _signature(file: BinaryIO) -> Tuple[int, int]:
+    stat = os.fstat(file.fileno())
+    return stat.st_size, stat.st_mtime_ns
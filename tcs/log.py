@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Logging Pipeline
+================
+Modified: 2021-06
+
+Queued logging for high frame rates. `listen` moves the configured handlers behind a single
+`DeferredQueueHandler`, so the threads logging per frame only enqueue their records and a background
+`QueueListener` thread formats and writes them to the console. Unlike the stdlib `QueueHandler` it
+enqueues records unformatted, their arguments must therefore not be mutated after they are logged.
+`Hex` defers the hex conversion of a frame buffer logged as an argument to formatting, which is
+skipped altogether for records that are filtered or sampled out.
+
+`SamplingFilter` rate limits the records of each logger it is attached to with a token bucket per
+logger name. Warnings and errors always pass, records sampled out are counted in the
+`tcs_log_records_sampled_total` metric. Buckets are updated without a lock, concurrent records may
+overdraw a bucket by a few tokens.
+
+Dependencies
+------------
+```
+import time
+import atexit
+import logging
+from queue import SimpleQueue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Tuple, Union
+
+from tcs.metrics.registry import Registry as metrics
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import time
+import atexit
+import logging
+from queue import SimpleQueue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Tuple, Union
+
+from tcs.metrics.registry import Registry as metrics
+
+
+class Hex:
+    """Log argument rendering a buffer in hex when the record is formatted"""
+    __slots__ = ('data',)
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self.data = data
+
+    def __str__(self) -> str:
+        return self.data.hex()
+
+
+class DeferredQueueHandler(QueueHandler):
+    """`QueueHandler` enqueueing records as logged, leaving their formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the stdlib handler merges the message and arguments here, in the logging thread
+        return record
+
+
+class SamplingFilter(logging.Filter):
+
+    def __init__(self, rate: float = 50.0, burst: int = 100, level: int = logging.WARNING):
+        """
+        :param rate: records per second passed for each logger
+        :type rate: float
+        :param burst: records each logger may emit at once
+        :type burst: int
+        :param level: records at or above this level are never sampled out
+        :type level: int
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.level = level
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # tokens left and time of the last record per logger
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.level: return True
+        now = time.monotonic()
+        tokens, stamp = self._buckets.get(record.name, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+        if tokens < 1:
+            self._buckets[record.name] = tokens, now
+            metrics.log_records_sampled.labels(record.name).inc()
+            return False
+        self._buckets[record.name] = tokens - 1, now
+        return True
+
+
+def listen() -> QueueListener:
+    """
+    Move the handlers of every configured logger behind a queue drained by a background thread,
+    the listener is stopped at exit once the queue is flushed
+
+    :return: started listener
+    :rtype: QueueListener
+    """
+    queue = SimpleQueue()
+    handler = DeferredQueueHandler(queue)
+    loggers = [logging.getLogger()] + [logger for logger in logging.Logger.manager.loggerDict.values()
+                                       if isinstance(logger, logging.Logger)]
+    targets = []
+    for logger in loggers:
+        if not logger.handlers: continue
+        for target in logger.handlers[:]:
+            if target not in targets: targets.append(target)
+            logger.removeHandler(target)
+        logger.addHandler(handler)
+    listener = QueueListener(queue, *targets, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics
+=======
+Modified: 2021-06
+
+In-process metrics cheap enough for the transmit hot path. Every thread that updates a metric gets
+its own cell, a small list only that thread writes to, so updates take no locks. Collection sums
+the cells of all threads, which may lag an update in progress on another thread by one increment.
+When a thread exits its cell is folded into a base total, so metrics updated from short lived
+executor threads do not accumulate cells.
+
+Metrics render in the Prometheus text exposition format.
+
+Dependencies
+------------
+```
+import bisect
+import weakref
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import bisect
+import weakref
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# default histogram buckets in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Sentinel:
+    """Thread-local object whose collection marks the exit of its thread"""
+    __slots__ = ('__weakref__',)
+
+
+class Cells:
+    """Per-thread cells of `size` values"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        # cells of live threads by id
+        self._cells: Dict[int, List[float]] = {}
+        # values of the cells of exited threads
+        self._base: List[float] = [0] * size
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0] * self.size
+            # thread-local values are released when the thread exits, fold the cell into the base then
+            sentinel = self._local.sentinel = _Sentinel()
+            weakref.finalize(sentinel, self._fold, cell)
+            with self._lock:
+                self._cells[id(cell)] = cell
+            return cell
+
+    def _fold(self, cell: List[float]) -> None:
+        with self._lock:
+            self._base = [base + value for base, value in zip(self._base, cell)]
+            del self._cells[id(cell)]
+
+    def sum(self) -> List[float]:
+        with self._lock:
+            return [sum(values) for values in zip(self._base, *self._cells.values())]
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Metric] = {}
+        self._values = self._cells()
+
+    def _cells(self) -> Cells:
+        return Cells(1)
+
+    def labels(self, *values) -> 'Metric':
+        """
+        Child metric for a set of label values
+
+        :raises ValueError: if the number of values does not match the label names
+        :return: child metric
+        :rtype: Metric
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is not None: return child
+        if len(key) != len(self.labelnames):
+            raise ValueError("{} expects labels {}".format(self.name, self.labelnames))
+        # setdefault is atomic, concurrent first uses share one child
+        return self._children.setdefault(key, self._child())
+
+    def _child(self) -> 'Metric':
+        return type(self)(self.name, self.documentation)
+
+    def collect(self) -> Iterator[str]:
+        yield "# HELP {} {}".format(self.name, self.documentation)
+        yield "# TYPE {} {}".format(self.name, self.kind)
+        if not self.labelnames:
+            yield from self._samples('')
+            return
+        for values, child in list(self._children.items()):
+            yield from child._samples(','.join('{}="{}"'.format(k, v) for k, v in zip(self.labelnames, values)))
+
+    def _samples(self, labels: str) -> Iterator[str]:
+        yield "{}{} {}".format(self.name, "{" + labels + "}" if labels else '', _format(self._values.sum()[0]))
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1) -> None:
+        self._values.cell()[0] += amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1) -> None:
+        self._values.cell()[0] += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._values.cell()[0] -= amount
+
+    def value(self) -> float:
+        """
+        Current value of the gauge, summed over its children if it has labels
+        """
+        if self.labelnames: return sum(child.value() for child in list(self._children.values()))
+        return self._function() if self._function is not None else self._values.sum()[0]
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """
+        Report the value of `function` at collection instead of the increments
+        """
+        self._function = function
+
+    def _samples(self, labels: str) -> Iterator[str]:
+        if self._function is None:
+            yield from super()._samples(labels)
+            return
+        yield "{}{} {}".format(self.name, "{" + labels + "}" if labels else '', _format(self._function()))
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _cells(self) -> Cells:
+        # observations per bucket, then the sum and count of all observations
+        return Cells(len(self.buckets) + 3)
+
+    def _child(self) -> 'Histogram':
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        cell = self._values.cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def _samples(self, labels: str) -> Iterator[str]:
+        values = self._values.sum()
+        prefix = labels + ',' if labels else ''
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), values):
+            cumulative += count
+            yield '{}_bucket{{{}le="{}"}} {}'.format(self.name, prefix, _format(bound), _format(cumulative))
+        suffix = "{" + labels + "}" if labels else ''
+        yield "{}_sum{} {}".format(self.name, suffix, _format(values[-2]))
+        yield "{}_count{} {}".format(self.name, suffix, _format(values[-1]))
+
+
+def _format(value: float) -> str:
+    if value == float('inf'): return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
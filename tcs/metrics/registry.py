@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Metric Registry
+===============
+Modified: 2021-06
+
+Dependencies
+------------
+```
+from tcs.metrics.metric import Counter, Gauge, Histogram, Metric
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+
+from tcs.metrics.metric import Counter, Gauge, Histogram, Metric
+
+
+class Registry:
+    # transmit pipeline
+    frames_transmitted = Counter('tcs_frames_transmitted_total', 'Payload frames written to the transmitter',
+                                 ['channel'])
+    idle_frames = Counter('tcs_idle_frames_total', 'Idle frames written to the transmitter', ['channel'])
+    write_timeouts = Counter('tcs_write_timeouts_total', 'Frame writes to the transmitter that timed out',
+                             ['channel'])
+    write_latency = Histogram('tcs_write_seconds', 'Latency of frame writes to the transmitter', ['channel'])
+    queue_depth = Gauge('tcs_queue_depth_bytes', 'Payload bytes queued for transmission', ['channel'])
+    queue_paused_time = Gauge('tcs_queue_paused_seconds', 'Total time producers have spent paused by the frame queue',
+                              ['channel'])
+    # frame rate control
+    frame_rate = Gauge('tcs_frame_rate', 'Payload frame rate paced at each access point', ['channel', 'ap'])
+    rate_increases = Counter('tcs_frame_rate_increases_total', 'Frame rate increases by the rate controller',
+                             ['channel', 'ap'])
+    rate_decreases = Counter('tcs_frame_rate_decreases_total', 'Frame rate decreases by the rate controller',
+                             ['channel', 'ap'])
+    # frame cache
+    cache_hits = Counter('tcs_cache_hits_total', 'APR keys resolved by the frame cache')
+    cache_misses = Counter('tcs_cache_misses_total', 'APR keys not found in the frame cache')
+    cache_expiries = Counter('tcs_cache_expiries_total', 'Frame digests removed from the cache by their ttl')
+    cache_evictions = Counter('tcs_cache_evictions_total', 'Frame digests evicted from the full cache')
+    # events
+    dispatch_latency = Histogram('tcs_event_dispatch_seconds', 'Latency of event dispatch to all handlers',
+                                 ['event'])
+    # receiver sessions
+    responses = Counter('tcs_responses_total', 'Frame responses received from receivers', ['type'])
+    retransmissions = Counter('tcs_retransmissions_total', 'Frames retransmitted after a capture failure')
+    active_sessions = Gauge('tcs_active_sessions', 'Receiver sessions currently connected')
+    # api
+    rejections = Counter('tcs_api_rejections_total', 'Registration requests rejected by admission control',
+                         ['status'])
+    # logging
+    log_records_sampled = Counter('tcs_log_records_sampled_total', 'Log records dropped by rate sampling', ['logger'])
+
+    @classmethod
+    def exposition(cls) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+
+        :return: exposition
+        :rtype: str
+        """
+        lines = []
+        for metric in vars(cls).values():
+            if isinstance(metric, Metric): lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
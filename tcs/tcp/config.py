@@ -1,5 +1,28 @@
 class APConfig:
     DEFAULT_ADDR = "localhost:65432"
+    # well known address of the receiver session server
+    SESSION_ADDR = "localhost:6000"
+    # bytes of entropy in session tokens and seconds a token remains valid after registration
+    TOKEN_BYTES = 8
+    TOKEN_TTL = 10
+    # seconds a receiver has to present its token once connected
+    HANDSHAKE_TIMEOUT = 10
+    # capture attempts per frame before the session is terminated
+    CAPTURE_RETRIES = 5
+    # retransmissions allowed per session and the exponential backoff between retransmissions of a frame
+    RETRY_BUDGET = 256
+    BACKOFF_BASE = 0.05
+    BACKOFF_MAX = 2.0
+    # weight of the latest response in the retransmission rate fed back to the tcu
+    RATE_SMOOTHING = 0.125
+    # largest number of unacknowledged frames a receiver may negotiate
+    MAX_WINDOW = 16
+    # bytes of a streamed payload a receiver may upload ahead of its acknowledged frames
+    UPLOAD_BUFFER = 1 << 14
+    # seconds a binary session may remain idle between transfers before it is closed
+    IDLE_TIMEOUT = 60
+    # seconds a receiver may take to respond during a transfer before the session is closed
+    SESSION_TIMEOUT = 60
     # default test data
     SENSITIVE_DATA = bytearray([1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
     FRAME_CNT = len(SENSITIVE_DATA)
@@ -0,0 +1,127 @@
+"""
+LFTP Messages
+=============
+Modified: 2021-06
+
+Message definitions for the sequenced variants of the LFTP frame exchange. Every message carries
+the sequence number of the frame it refers to so that several frames can be in flight at once.
+
+Messages have two wire formats (see docs/protocols.md). The text format is a newline terminated
+`crc~TYPE~seq` line. The binary format is a fixed `HEADER` followed by `length` bytes of payload and
+is read with the incremental `MessageParser`, which tolerates messages split across or coalesced
+within reads.
+
+Dependencies
+------------
+```
+import struct
+import binascii
+from enum import IntEnum
+from typing import List, NamedTuple
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import struct
+import binascii
+from enum import IntEnum
+from typing import List, NamedTuple
+
+# first byte of every binary message, distinguishes binary sessions from text handshakes
+MAGIC = 0xA7
+VERSION = 1
+# magic, version, type, reserved, seq, crc32, payload length
+HEADER = struct.Struct('!BBBxIII')
+# largest payload accepted in a single binary message
+MAX_PAYLOAD = 1 << 16
+
+
+class MessageType(IntEnum):
+    # binary handshake, seq carries the window and the payload the session token
+    HELLO = 1
+    # binary receiver payload chunk
+    DATA = 2
+    UP = 3
+    # cumulative acknowledgment of every frame up to and including seq
+    ACK = 4
+    # selective acknowledgment of frame seq only
+    SACK = 5
+    NACK = 6
+    # binary payload declaration, seq carries the payload length and in the reply the upload buffer
+    BEGIN = 7
+    # keepalive of an idle binary session, answered with a PONG of the same seq
+    PING = 8
+    PONG = 9
+
+
+class Message(NamedTuple):
+    type: MessageType
+    seq: int
+    crc: int
+    payload: bytes = b''
+
+    def encode(self) -> bytes:
+        return "{}~{}~{}\n".format(self.crc, self.type.name, self.seq).encode()
+
+    @classmethod
+    def decode(cls, line: bytes) -> 'Message':
+        """
+        Parse a text message line
+
+        :param line: newline terminated message
+        :type line: bytes
+        :raises ValueError: if the line is not a valid message
+        :return: parsed message
+        :rtype: Message
+        """
+        crc, kind, seq = line.decode().strip().split('~')
+        try:
+            return cls(MessageType[kind], int(seq), int(crc))
+        except KeyError as exc:
+            raise ValueError("unknown message type: {}".format(kind)) from exc
+
+    def pack(self) -> bytes:
+        return HEADER.pack(MAGIC, VERSION, self.type, self.seq, self.crc, len(self.payload)) + self.payload
+
+    @classmethod
+    def data(cls, kind: MessageType, seq: int, payload: bytes) -> 'Message':
+        """
+        Construct a message carrying a payload checksummed with crc32
+        """
+        return cls(kind, seq, binascii.crc32(payload), payload)
+
+
+class MessageParser:
+    """Incremental parser for binary messages"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Message]:
+        """
+        Buffer received bytes and parse every complete message
+
+        :param data: bytes read from the connection
+        :type data: bytes
+        :raises ValueError: if the stream is not a valid version of the binary protocol or a
+        payload fails its checksum
+        :return: messages completed by the received bytes
+        :rtype: List[Message]
+        """
+        self._buffer += data
+        messages = []
+        offset = 0
+        while len(self._buffer) - offset >= HEADER.size:
+            magic, version, kind, seq, crc, length = HEADER.unpack_from(self._buffer, offset)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("unsupported protocol: {:#x} version {}".format(magic, version))
+            if length > MAX_PAYLOAD:
+                raise ValueError("payload of {} bytes exceeds limit".format(length))
+            end = offset + HEADER.size + length
+            if len(self._buffer) < end: break
+            payload = bytes(self._buffer[offset + HEADER.size:end])
+            if length and binascii.crc32(payload) != crc:
+                raise ValueError("payload checksum mismatch on message {}".format(seq))
+            messages.append(Message(MessageType(kind), seq, crc, payload))
+            offset = end
+        del self._buffer[:offset]
+        return messages
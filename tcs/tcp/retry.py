@@ -0,0 +1,90 @@
+"""
+Retry Budget
+============
+Modified: 2021-06
+
+Retransmission accounting for a receiver session. Each capture `NACK` of a frame is charged against
+the retry limit of the frame and the retransmission budget of the session, and is answered after an
+exponential backoff so that a receiver struggling to capture is not flooded with retransmissions.
+
+The budget also maintains the retransmission rate of the session, an exponentially weighted moving
+average of the `NACK` responses over all responses, which sessions publish through the `feedback`
+event.
+
+Dependencies
+------------
+```
+from typing import Dict
+
+from tcs.tcp.config import APConfig as ac
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+from typing import Dict
+
+from tcs.tcp.config import APConfig as ac
+
+
+class RetryBudget:
+
+    def __init__(self, budget: int = ac.RETRY_BUDGET, limit: int = ac.CAPTURE_RETRIES,
+                 backoff: float = ac.BACKOFF_BASE, ceiling: float = ac.BACKOFF_MAX,
+                 smoothing: float = ac.RATE_SMOOTHING):
+        """
+        :param budget: retransmissions allowed over the lifetime of the session
+        :type budget: int
+        :param limit: capture attempts allowed per frame
+        :type limit: int
+        :param backoff: delay in seconds before the first retransmission of a frame
+        :type backoff: float
+        :param ceiling: largest delay in seconds before a retransmission
+        :type ceiling: float
+        :param smoothing: weight of the latest response in the retransmission rate
+        :type smoothing: float
+        """
+        self.budget = budget
+        self.limit = limit
+        self.backoff = backoff
+        self.ceiling = ceiling
+        self.smoothing = smoothing
+        self.responses = 0
+        self.retransmissions = 0
+        self.rate = 0.0
+        self._nacks: Dict[int, int] = {}  # consecutive capture failures of each unacknowledged frame
+
+    @property
+    def remaining(self) -> int:
+        return self.budget - self.retransmissions
+
+    def ack(self, seq: int) -> None:
+        """
+        Record the capture of a frame
+        """
+        self._nacks.pop(seq, None)
+        self._record(0.0)
+
+    def nack(self, seq: int) -> float:
+        """
+        Charge a capture failure of a frame against its retry limit and the session budget
+
+        :param seq: sequence number of the frame
+        :type seq: int
+        :raises RuntimeError: if the frame exceeds its retry limit or the session exhausts its budget
+        :return: seconds to wait before retransmitting the frame
+        :rtype: float
+        """
+        self._record(1.0)
+        nacks = self._nacks.get(seq, 0) + 1
+        if nacks >= self.limit:
+            raise RuntimeError("Maximum retry limit reached")
+        if self.retransmissions >= self.budget:
+            raise RuntimeError("Retransmission budget of {} frames exhausted".format(self.budget))
+        self._nacks[seq] = nacks
+        self.retransmissions += 1
+        return min(self.backoff * pow(2, nacks - 1), self.ceiling)
+
+    def _record(self, nack: float) -> None:
+        self.responses += 1
+        # seed the average with the first response
+        weight = self.smoothing if self.responses > 1 else 1.0
+        self.rate += weight * (nack - self.rate)
@@ -0,0 +1,153 @@
+"""
+Session Server
+==============
+Modified: 2021-06
+
+Asyncio stream server hosting every receiver session on a single well known port. Registration
+through the API issues a short lived session token bound to the access point of the receiver, which
+the API threads record with `SessionServer.issue` directly in the thread safe cache of pending
+registrations. The receiver presents the token in the first line it sends after connecting and its connection is
+served as a task on the TCU event loop.
+
+The token may be followed by the number of frames the receiver wants in flight, `<token> <window>`.
+The server answers with the granted window, at most `APConfig.MAX_WINDOW`, and the session runs the
+windowed exchange. Receivers that send only the token run the stop-and-wait exchange.
+
+Receivers speaking the binary framing open with a `HELLO` message instead, recognised by its leading
+`MAGIC` byte, which carries the requested window as sequence number and the token as payload,
+optionally followed by space separated `option=value` session options. The server answers with a
+`HELLO` carrying the granted window and the options it accepted. `fec=<r>` protects each frame
+with a Hamming code of `r` parity bits per codeword (see `tcs.tcu.fec`), `compress=<method>`
+compresses payloads with zlib or lzma before segmentation (see `tcs.tcu.compression`).
+
+Dependencies
+------------
+```
+import asyncio
+import logging
+from typing import Optional
+
+from cacheout import Cache
+
+from tcs.cache.cache import AccessPoint
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcu.compression import METHODS
+from tcs.tcp.config import APConfig as ac
+from tcs.tcp.protocol import MAGIC, Message, MessageParser, MessageType
+from tcs.tcp.session import Session
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from cacheout import Cache
+
+from tcs.cache.cache import AccessPoint
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcu.compression import METHODS
+from tcs.tcp.config import APConfig as ac
+from tcs.tcp.protocol import MAGIC, Message, MessageParser, MessageType
+from tcs.tcp.session import Session
+
+
+class SessionServer:
+
+    # access points of registered receivers awaiting connection keyed by session token
+    _pending = Cache(maxsize=0, ttl=ac.TOKEN_TTL)
+
+    def __init__(self, addr: str = ac.SESSION_ADDR):
+        self._log = logging.getLogger(__name__)
+        host, port = addr.split(':')
+        self.address = (host, int(port))
+        self._log.info("%s successfully instantiated", __name__)
+
+    @classmethod
+    def issue(cls, token: str, ap: AccessPoint) -> None:
+        """
+        Record the registration of a receiver, its token is valid for `APConfig.TOKEN_TTL` seconds.
+        Safe to call from any thread.
+
+        :param token: single use session token
+        :type token: str
+        :param ap: access point the receiver registered from
+        :type ap: AccessPoint
+        """
+        cls._pending.set(token, ap)
+
+    async def run(self) -> None:
+        server = await asyncio.start_server(self._accept, *self.address)
+        self._log.info("Serving receiver sessions on %s:%s", *self.address)
+        async with server:
+            await server.serve_forever()
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info('peername')
+        try:
+            first = await asyncio.wait_for(reader.read(1), timeout=ac.HANDSHAKE_TIMEOUT)
+            binary = bool(first) and first[0] == MAGIC
+            line = first if binary else first + await asyncio.wait_for(reader.readline(), ac.HANDSHAKE_TIMEOUT)
+        except (asyncio.TimeoutError, ValueError, OSError):
+            binary, line = False, b''
+        if binary:
+            await self._accept_binary(line, reader, writer)
+            return
+        token, *window = line.decode(errors='replace').split() or ['']
+        ap = self._claim(token, peer)
+        if ap is None:
+            writer.close()
+            return
+        granted = None
+        if window:
+            granted = min(max(int(window[0]), 1), ac.MAX_WINDOW) if window[0].isdigit() else 1
+            writer.write("{}\n".format(granted).encode())
+        await Session(reader, writer, ap, granted).run()
+
+    async def _accept_binary(self, first: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info('peername')
+        parser = MessageParser()
+        try:
+            messages = parser.feed(first)
+            while not messages:
+                data = await asyncio.wait_for(reader.read(1024), timeout=ac.HANDSHAKE_TIMEOUT)
+                if not data: break
+                messages = parser.feed(data)
+        except (asyncio.TimeoutError, ValueError, OSError):
+            messages = []
+        hello = messages.pop(0) if messages else None
+        payload = hello.payload.decode(errors='replace') if hello and hello.type is MessageType.HELLO else ''
+        token, *options = payload.split() or ['']
+        ap = self._claim(token, peer)
+        if ap is None:
+            writer.close()
+            return
+        granted = min(max(hello.seq, 1), ac.MAX_WINDOW)
+        options = dict(option.partition('=')[::2] for option in options)
+        accepted = []
+        fec = None
+        if options.get('fec', '').isdigit():
+            # numpy is only loaded once a receiver negotiates forward error correction
+            from tcs.tcu.fec import HammingCode
+            try:
+                fec = HammingCode(int(options['fec']), pow(tc.DIM, 3))
+                accepted.append('fec={}'.format(fec.r))
+            except ValueError as exc:
+                self._log.warning("Declined forward error correction for %s: %s", peer, exc)
+        compression = options.get('compress') if options.get('compress') in METHODS else None
+        if compression is not None: accepted.append('compress={}'.format(compression))
+        writer.write(Message.data(MessageType.HELLO, granted, ' '.join(accepted).encode()).pack())
+        session = Session(reader, writer, ap, granted, parser, fec, compression)
+        # messages coalesced with the handshake
+        session.pending.extend(messages)
+        await session.run()
+
+    def _claim(self, token: str, peer) -> Optional[AccessPoint]:
+        ap = self._pending.get(token)
+        if ap is None:
+            self._log.warning("Rejected connection from %s with invalid or expired session token", peer)
+            return None
+        # tokens are single use
+        self._pending.delete(token)
+        return ap
@@ -0,0 +1,430 @@
+"""
+Receiver Session
+================
+Modified: 2021-06
+
+A `Session` serves one receiver connection of the `SessionServer`. It reads the receiver payload,
+dispatches it to the TCU of the channel the receiver registered on and runs the LFTP frame exchange
+for each frame of the payload.
+
+Receivers that negotiate a window run the sliding window exchange: up to `window` frames are in
+flight, acknowledged cumulatively (`ACK`) or selectively (`SACK`) by sequence number. Receivers that
+do not negotiate a window run the original stop-and-wait exchange.
+
+Sessions opened with a binary `HELLO` exchange the same messages in the binary framing of
+`tcs.tcp.protocol` and always run the sliding window exchange. Their payload is streamed: the
+receiver declares its length with `BEGIN` and uploads it in `DATA` chunks, which are dispatched to
+the TCU as they arrive so transmission overlaps the upload. The receiver keeps at most
+`APConfig.UPLOAD_BUFFER` bytes ahead of its acknowledged frames, bounding the memory of a session
+regardless of the payload length. Uploaded chunks are queued on the TCU one at a time in the
+background, while the frame queue is paused the session keeps reading responses and granting the
+uplink credits of the frames already queued.
+
+Binary sessions are persistent. Once a transfer completes the receiver may start another with a
+single `BEGIN` on the same connection, and may keep the connection alive with `PING` messages. The
+session is closed once it has been idle for `APConfig.IDLE_TIMEOUT` seconds or the receiver
+disconnects between transfers. During a transfer a receiver that does not respond for
+`APConfig.SESSION_TIMEOUT` seconds is disconnected and the window it held on the TCU is released.
+
+Capture failures are charged against the `RetryBudget` of the session, which delays retransmissions
+with exponential backoff. After each response the session publishes its retransmission rate to the
+TCU through the `feedback` event.
+
+Binary sessions may negotiate forward error correction, in which case each frame carries a block of
+the payload in Hamming codewords and the `UP` message carries the crc32 of the block so that the
+receiver verifies the frame after correcting it. They may also negotiate compression, in which case
+each payload is compressed by a `Compressor` before it is cut into frames.
+
+Every session publishes its progress to the `SessionTable` while it is connected.
+
+Dependencies
+------------
+```
+import asyncio
+import logging
+import binascii
+import time
+import itertools
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Set, Tuple, Union
+
+from tcs.event.registry import Registry as events
+from tcs.cache.cache import AccessPoint
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcu.compression import Compressor
+from tcs.tcp.config import APConfig as ac
+from tcs.tcp.protocol import Message, MessageParser, MessageType
+from tcs.tcp.retry import RetryBudget
+from tcs.tcp.status import SessionStatus, SessionTable as sessions
+from tcs.metrics.registry import Registry as metrics
+
+if TYPE_CHECKING:
+    from tcs.tcu.fec import HammingCode
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+
+import asyncio
+import logging
+import binascii
+import time
+import itertools
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Set, Tuple, Union
+
+from tcs.event.registry import Registry as events
+from tcs.cache.cache import AccessPoint
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcu.compression import Compressor
+from tcs.tcp.config import APConfig as ac
+from tcs.tcp.protocol import Message, MessageParser, MessageType
+from tcs.tcp.retry import RetryBudget
+from tcs.tcp.status import SessionStatus, SessionTable as sessions
+from tcs.metrics.registry import Registry as metrics
+
+if TYPE_CHECKING:
+    from tcs.tcu.fec import HammingCode
+
+
+class Session:
+    _ids = itertools.count(1)
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, ap: AccessPoint,
+                 window: Optional[int] = None, parser: Optional[MessageParser] = None,
+                 fec: Optional['HammingCode'] = None, compression: Optional[str] = None):
+        self._log = logging.getLogger(__name__)
+        self.reader = reader
+        self.writer = writer
+        # transmitter channel and access point the receiver captured its apr key from
+        self.ap = ap
+        # negotiated number of frames in flight, None for the stop-and-wait exchange
+        self.window = window
+        # parser of the binary framing, None for text sessions
+        self.parser = parser
+        self.pending: Deque[Message] = deque()  # parsed binary messages not yet handled
+        self._receiving: Optional[asyncio.Future] = None  # read of the next message still in progress
+        self.peer = writer.get_extra_info('peername')
+        self.id = next(self._ids)
+        self.retry = RetryBudget()
+        # forward error correction applied to the frames and compression method applied to the payloads of
+        # binary sessions
+        self.fec = fec
+        self.compression = compression
+        self.status = SessionStatus(self.id, self.peer, ap, window, None if fec is None else repr(fec), compression)
+
+    async def run(self) -> None:
+        self._log.debug("connection from %s", self.peer)
+        metrics.active_sessions.inc()
+        sessions.add(self.status)
+        try:
+            if self.parser is not None:
+                await self.serve()
+                return
+            # receive ready response from client
+            data = await self.reader.read(1024)
+            self._log.debug("echo message from client: %s", data)
+            if self.window is not None:
+                await self.send_window(data, len(data))
+                return
+            await events.enqueue.dispatch(data, self.ap, self.id)
+            frames = self.frames(data)
+            self.status.begin(len(data))
+            self.status.uploaded = len(data)
+            self.status.frames = self.status.total = len(frames)
+            for frame in frames:
+                await self.send_frame(frame)
+                self.status.acked += 1
+                await events.uplink.dispatch(self.ap.channel, self.id, 1)
+            self.status.end()
+        except (RuntimeError, OSError, ValueError) as exc:
+            self._log.exception("Session with %s terminated: \n%s", self.peer, exc)
+        finally:
+            # discard the frames and credits the session left on the tcu
+            await events.release.dispatch(self.ap, self.id)
+            metrics.active_sessions.dec()
+            sessions.remove(self.id)
+            self.writer.close()
+            await self.writer.wait_closed()
+            self._log.info("Closed session with %s", self.peer)
+
+    @staticmethod
+    def frames(data: bytes) -> List[bytes]:
+        # final frame is padded with null bytes as it is by the tcu
+        return [data[i:i + tc.FRAME_SIZE].ljust(tc.FRAME_SIZE, b'\x00') for i in range(0, len(data), tc.FRAME_SIZE)]
+
+    async def send(self, data: Union[str, int]) -> None:
+        if type(data) is str: self.writer.write(data.encode())
+        elif type(data) is int: self.writer.write(bytes([data]))
+        await self.writer.drain()
+        self._log.info("sent: %s to address: %s", data, self.peer)
+
+    async def receive(self) -> Tuple[int, str]:
+        response = await self.reader.read(1024)
+        if not response: raise ConnectionResetError
+        self._log.debug("msgback: %s", response)
+        # parse msg back
+        str_crc, resp = response.decode().split('~')
+        crc = int(str_crc)
+        self._log.debug("crc: %s, resp: %s", crc, resp)
+        return crc, resp
+
+    def createmsg(self, crcval, msg) -> str:
+        newmsg = str(crcval) + '~' + msg
+        return newmsg
+
+    async def send_window(self, data: bytes, length: int) -> None:
+        """
+        Run the sliding window exchange for the frames of a payload. Any part of the payload not
+        in `data` is received in `DATA` messages during the exchange.
+
+        :param data: payload received so far
+        :type data: bytes
+        :param length: total payload length
+        :type length: int
+        :raises RuntimeError: if a frame exceeds its capture retry limit
+        :raises ConnectionError: if a response does not match the frame it refers to
+        :raises TimeoutError: if the receiver does not respond for `APConfig.SESSION_TIMEOUT` seconds
+        :raises ValueError: if the receiver uploads more than `length` bytes, or starts a chunk more
+        than `APConfig.UPLOAD_BUFFER` bytes ahead of the acknowledged frames
+        """
+        # payload bytes carried by each frame
+        block = tc.FRAME_SIZE if self.fec is None else self.fec.data_size
+        compressor = None if self.compression is None else Compressor(self.compression)
+        # frame count, known once the whole payload has been uploaded and segmented
+        total: Optional[int] = None
+        cut_frames = 0
+        ready: Deque[Tuple[bytes, int]] = deque()  # queued frames not yet sent and the crc of their data
+        # chunks not yet queued on the tcu with their frames and the crc of their data, or the sequence number of
+        # the frame a chunk retransmits
+        uploads: Deque[Tuple[bytes, List[Tuple[bytes, int]], Optional[int]]] = deque()
+        queued: Optional[asyncio.Future] = None  # enqueue of the chunk at the head of uploads
+        carry = b''  # uploaded bytes short of a whole frame
+        uploaded = 0
+        produced = 0  # payload bytes cut into frames or carried, after compression
+        inflight: Dict[int, Tuple[bytes, int, int]] = {}  # frame, data crc and crc of the UP message sent for it
+        start = time.perf_counter()
+        acked: Set[int] = set()
+        base = 0  # first unacknowledged frame
+        seq = 0  # next frame to send
+
+        async def ingest(chunk: bytes) -> None:
+            nonlocal carry, uploaded, produced, total, cut_frames
+            # the receiver may only start a chunk while it is within the upload buffer of the acknowledged frames
+            if produced - base * block >= ac.UPLOAD_BUFFER:
+                raise ValueError("receiver uploaded beyond its buffer of {} bytes".format(ac.UPLOAD_BUFFER))
+            uploaded += len(chunk)
+            if uploaded > length or total is not None:
+                raise ValueError("payload exceeds declared length of {} bytes".format(length))
+            final = uploaded == length
+            self.status.uploaded = uploaded
+            if compressor is not None: chunk = compressor.compress(chunk, final)
+            produced += len(chunk)
+            # keep the chunks dispatched to the tcu aligned to frames
+            chunk = carry + chunk
+            cut = len(chunk) if final else len(chunk) - len(chunk) % block
+            chunk, carry = chunk[:cut], chunk[cut:]
+            count = -(-len(chunk) // block)
+            cut_frames += count
+            self.status.frames = cut_frames
+            if final:
+                total = self.status.total = cut_frames
+                self._log.debug("number of transmission frames: %s", total)
+            if not chunk: return
+            if self.fec is None:
+                uploads.append((chunk, [(frame, binascii.crc32(frame)) for frame in self.frames(chunk)], None))
+                return
+            coded = self.fec.encode(chunk)
+            chunk = chunk.ljust(count * block, b'\x00')
+            uploads.append((coded, [(coded[i * tc.FRAME_SIZE:(i + 1) * tc.FRAME_SIZE],
+                                     binascii.crc32(chunk[i * block:(i + 1) * block])) for i in range(count)], None))
+
+        # open the tcu window, it may run window - 1 frames ahead of the acknowledgments
+        await events.uplink.dispatch(self.ap.channel, self.id, self.window - 1)
+        self.status.begin(length)
+        try:
+            await ingest(data)
+            while total is None or base < total:
+                # queue the chunks on the tcu in order, their frames are sent once they are queued
+                if queued is None and uploads:
+                    queued = asyncio.ensure_future(events.enqueue.dispatch(uploads[0][0], self.ap, self.id))
+                if queued is not None and queued.done():
+                    queued = None
+                    _, frames, resend = uploads.popleft()
+                    ready.extend(frames)
+                    # a retransmitted frame may have been acknowledged from its earlier display meanwhile
+                    if resend in inflight:
+                        frame, crc, _ = inflight[resend]
+                        inflight[resend] = frame, crc, await self.send_message(MessageType.UP, resend, crc)
+                    continue
+                while ready and seq < base + self.window:
+                    frame, crc = ready.popleft()
+                    inflight[seq] = frame, crc, await self.send_message(MessageType.UP, seq, crc)
+                    seq += 1
+                # the receiver owes a response unless the session only waits for the tcu to queue a chunk
+                timeout = ac.SESSION_TIMEOUT if inflight or queued is None else None
+                msg = await self.receive_response(queued, timeout)
+                if msg is None: continue
+                if msg.type is MessageType.DATA:
+                    await ingest(msg.payload)
+                    continue
+                if msg.type is MessageType.PING:
+                    await self.send_message(MessageType.PONG, msg.seq, 0)
+                    continue
+                # duplicate acknowledgment of frames that have left the window
+                if msg.seq < base: continue
+                if msg.seq not in inflight or msg.crc != inflight[msg.seq][2]:
+                    self._log.error("Detected socket error")
+                    raise ConnectionError
+                metrics.responses.labels(msg.type.name).inc()
+                if msg.type is MessageType.NACK:
+                    self._log.error("Detected client tesseract capture error on frame %s", msg.seq)
+                    delay = self.retry.nack(msg.seq)
+                    self.status.retransmissions = self.retry.retransmissions
+                    await self.report()
+                    await asyncio.sleep(delay)
+                    # the tcu has moved on, queue the frame for display again and resend its UP once queued
+                    metrics.retransmissions.inc()
+                    await events.uplink.dispatch(self.ap.channel, self.id, 1)
+                    uploads.append((inflight[msg.seq][0], [], msg.seq))
+                    continue
+                if msg.type is MessageType.ACK: received = set(range(base, msg.seq + 1)) - acked
+                elif msg.type is MessageType.SACK: received = {msg.seq} - acked
+                else: raise ValueError("unexpected message: {}".format(msg))
+                for frame in received: self.retry.ack(frame)
+                if received: await self.report()
+                acked |= received
+                while base in acked:
+                    acked.discard(base)
+                    inflight.pop(base)
+                    base += 1
+                self.status.acked = base
+                if received: await events.uplink.dispatch(self.ap.channel, self.id, len(received))
+            self.status.end()
+            elapsed = time.perf_counter() - start
+            self._log.info("Transferred %s bytes in %s frames with %s (%s) in %.3fs, goodput %.1f B/s, "
+                           "%s retransmissions", length, total, self.fec, block, elapsed,
+                           length / elapsed if elapsed else 0.0, self.retry.retransmissions)
+            if compressor is not None:
+                self._log.info("Compressed payload to %s bytes with %s, ratio %.3f",
+                               compressor.compressed, compressor, compressor.ratio)
+        finally:
+            if queued is not None: queued.cancel()
+            if self._receiving is not None:
+                self._receiving.cancel()
+                self._receiving = None
+            # close the window opened on the tcu
+            await events.uplink.dispatch(self.ap.channel, self.id, 1 - self.window)
+
+    async def send_message(self, kind: MessageType, seq: int, crc: int) -> int:
+        """
+        Send a windowed protocol message
+
+        :return: crc32 of the message expected back in the response
+        :rtype: int
+        """
+        message = Message(kind, seq, crc)
+        packet = message.encode() if self.parser is None else message.pack()
+        self.writer.write(packet)
+        await self.writer.drain()
+        self._log.info("sent: %s to address: %s", packet, self.peer)
+        return binascii.crc32(packet)
+
+    async def receive_message(self) -> Message:
+        if self.parser is None:
+            line = await self.reader.readline()
+            if not line: raise ConnectionResetError
+            self._log.debug("msgback: %s", line)
+            return Message.decode(line)
+        while not self.pending:
+            data = await self.reader.read(4096)
+            if not data: raise ConnectionResetError
+            self.pending.extend(self.parser.feed(data))
+        msg = self.pending.popleft()
+        self._log.debug("msgback: %s", msg)
+        return msg
+
+    async def receive_response(self, queued: Optional[asyncio.Future] = None,
+                               timeout: Optional[float] = None) -> Optional[Message]:
+        """
+        Wait for the next message of the receiver or for a chunk to be queued on the tcu, whichever
+        comes first. A read interrupted by the chunk is resumed by the next call.
+
+        :param queued: enqueue in progress
+        :type queued: Optional[asyncio.Future]
+        :param timeout: seconds to wait, None to wait indefinitely
+        :type timeout: Optional[float]
+        :raises TimeoutError: if neither completes within `timeout` seconds
+        :return: next message, None if the chunk was queued first
+        :rtype: Optional[Message]
+        """
+        if self._receiving is None: self._receiving = asyncio.ensure_future(self.receive_message())
+        waiting = {self._receiving} if queued is None else {self._receiving, queued}
+        done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not done: raise TimeoutError("receiver {} did not respond within {}s".format(self.peer, timeout))
+        if not self._receiving.done(): return None
+        receiving, self._receiving = self._receiving, None
+        return receiving.result()
+
+    async def serve(self) -> None:
+        """
+        Serve transfers requested by the receiver of a binary session until it disconnects or idles
+        out
+
+        :raises ValueError: if the receiver sends a message outside of a transfer other than `BEGIN`
+        or `PING`
+        """
+        transfers = 0
+        while True:
+            try:
+                msg = await asyncio.wait_for(self.receive_message(), timeout=ac.IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self._log.info("Session with %s idle for %ss after %s transfers", self.peer, ac.IDLE_TIMEOUT, transfers)
+                return
+            except ConnectionResetError:
+                self._log.info("Receiver %s disconnected after %s transfers", self.peer, transfers)
+                return
+            if msg.type is MessageType.PING:
+                await self.send_message(MessageType.PONG, msg.seq, 0)
+                continue
+            if msg.type is not MessageType.BEGIN:
+                raise ValueError("unexpected message: {}".format(msg))
+            self._log.debug("streaming payload of %s bytes from %s", msg.seq, self.peer)
+            # grant the upload buffer
+            await self.send_message(MessageType.BEGIN, ac.UPLOAD_BUFFER, 0)
+            await self.send_window(b'', msg.seq)
+            transfers += 1
+
+    async def send_frame(self, data: bytes) -> None:
+        # store current crc32 data
+        frame_crc = binascii.crc32(data)
+        # store expected response
+        msg = self.createmsg(frame_crc, 'UP')
+        packet_crc = binascii.crc32(msg.encode())
+        while True:
+            await self.send(msg)
+            # receive response from client
+            try:
+                crc, resp = await asyncio.wait_for(self.receive(), timeout=ac.SESSION_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise TimeoutError("receiver {} did not respond within {}s".format(self.peer, ac.SESSION_TIMEOUT))
+            metrics.responses.labels('NACK' if resp == 'NACK' else 'ACK').inc()
+            # socket data scrambled
+            if crc != packet_crc and resp == 'NACK':
+                self._log.error("Detected socket error")
+                raise ConnectionError
+            # cube capture failed
+            if crc == packet_crc and resp == 'NACK':
+                self._log.error("Detected client tesseract capture error")
+                delay = self.retry.nack(0)
+                self.status.retransmissions = self.retry.retransmissions
+                await self.report()
+                await asyncio.sleep(delay)
+                metrics.retransmissions.inc()
+                continue
+            self.retry.ack(0)
+            await self.report()
+            return
+
+    async def report(self) -> None:
+        # publish the retransmission rate of the session to the tcu
+        await events.feedback.dispatch(self.ap, self.id, self.retry.rate)
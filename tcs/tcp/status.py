@@ -0,0 +1,131 @@
+"""
+Session Status
+==============
+Modified: 2021-06
+
+In-memory table of the receiver sessions connected to the `SessionServer` and the progress of their
+transfers. Each `SessionStatus` is written only by its session on the event loop of the session
+server, apart from the frame rate written by the TCU pacing its access point. Updates are plain
+attribute assignments and the table is a dict keyed by session id, so neither writers nor readers
+take a lock. A snapshot read from another thread may lag an update in progress by one frame.
+
+Dependencies
+------------
+```
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from tcs.cache.cache import AccessPoint
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from tcs.cache.cache import AccessPoint
+
+
+class SessionStatus:
+    __slots__ = ('id', 'peer', 'ap', 'window', 'fec', 'compression', 'connected', 'state', 'transfers', 'length',
+                 'uploaded', 'frames', 'total', 'acked', 'retransmissions', 'frame_rate', 'started')
+
+    def __init__(self, id: int, peer: Optional[Tuple[str, int]], ap: 'AccessPoint', window: Optional[int] = None,
+                 fec: Optional[str] = None, compression: Optional[str] = None):
+        self.id = id
+        self.peer = peer
+        self.ap = ap
+        self.window = window
+        self.fec = fec
+        self.compression = compression
+        self.connected = time.time()
+        # idle between transfers or transferring
+        self.state = 'idle'
+        self.transfers = 0
+        # progress of the current or last transfer
+        self.length = 0
+        self.uploaded = 0
+        self.frames = 0  # frames segmented so far
+        self.total: Optional[int] = None  # frame count, known once the whole payload is segmented
+        self.acked = 0
+        self.retransmissions = 0
+        # frames per second the tcu paces the access point of the session at
+        self.frame_rate: Optional[float] = None
+        self.started: Optional[float] = None
+
+    def begin(self, length: int) -> None:
+        """
+        Reset the progress for a new transfer of `length` bytes
+        """
+        self.length = length
+        self.uploaded = 0
+        self.frames = 0
+        self.total = None
+        self.acked = 0
+        self.started = time.perf_counter()
+        self.state = 'transferring'
+
+    def end(self) -> None:
+        self.transfers += 1
+        self.state = 'idle'
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Status of the session with the acknowledged frame rate and the estimated seconds left in the
+        current transfer, None until they can be estimated
+
+        :rtype: Dict[str, Any]
+        """
+        elapsed = time.perf_counter() - self.started if self.started is not None else 0.0
+        state, acked, total, frames, uploaded = self.state, self.acked, self.total, self.frames, self.uploaded
+        rate = acked / elapsed if elapsed else 0.0
+        eta = None
+        if state == 'transferring':
+            # extrapolate the frame count from the upload until the payload is segmented
+            if total is None and uploaded: total = round(frames * self.length / uploaded)
+            if total is not None and rate: eta = round((total - acked) / rate, 3)
+        return {
+            'id': self.id,
+            'peer': '{}:{}'.format(*self.peer[:2]) if self.peer else None,
+            'channel': self.ap.channel,
+            'ap': self.ap.index,
+            'window': self.window,
+            'fec': self.fec,
+            'compression': self.compression,
+            'connected': self.connected,
+            'state': state,
+            'transfers': self.transfers,
+            'length': self.length,
+            'uploaded': uploaded,
+            'frames': self.total if self.total is not None else frames,
+            'acked': acked,
+            'retransmissions': self.retransmissions,
+            'elapsed': round(elapsed, 3),
+            'ack_rate': round(rate, 3),
+            'frame_rate': self.frame_rate,
+            'eta': eta
+        }
+
+
+class SessionTable:
+
+    # connected sessions by id
+    _sessions: Dict[int, SessionStatus] = {}
+
+    @classmethod
+    def add(cls, status: SessionStatus) -> None:
+        cls._sessions[status.id] = status
+
+    @classmethod
+    def remove(cls, id: int) -> None:
+        cls._sessions.pop(id, None)
+
+    @classmethod
+    def get(cls, id: int) -> Optional[SessionStatus]:
+        return cls._sessions.get(id)
+
+    @classmethod
+    def snapshot(cls) -> List[Dict[str, Any]]:
+        # copy the values so sessions may connect and close while the snapshot is taken
+        return [status.snapshot() for status in list(cls._sessions.values())]
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Spatial Codec™
+==============
+Modified: 2021-06
+
+Vectorized port of the legacy `SpatialCodec`. A frame of dim³ bits is laid out in the cube along
+Hilbert's space filling curve, rotated about the vertical axis for the access point it is encoded
+for, and flattened into the pinout order of the transmitter hardware map.
+
+Every transformation is a fixed permutation of the frame bits so the codec precomputes one index
+array per access point (and per pair of access points for the decoded views) at construction.
+Encoding a frame is then a single fancy index over its unpacked bits.
+
+Dependencies
+------------
+```
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+# number of access points located in the cardinal directions about the vertical axis
+ACCESS_POINTS = 4
+
+
+def hilbert_curve(dim: int) -> np.ndarray:
+    """
+    Generate the 3D matrix mapping 1D bit indices onto Hilbert's space filling curve. Algorithm
+    based on the solution by user kylefinn @
+    https://stackoverflow.com/questions/14519267/algorithm-for-generating-a-3d-hilbert-space-filling-curve-in-python
+
+    :param dim: cube dimension, must be a power of 2
+    :type dim: int
+    :raises ValueError: if `dim` is not a power of 2
+    :return: dim x dim x dim matrix of bit indices
+    :rtype: np.ndarray
+    """
+    if dim < 1 or dim & (dim - 1):
+        raise ValueError("cube dimension must be a power of 2")
+    curve = np.zeros((dim, dim, dim), dtype=np.intp)
+    index = 0
+
+    def fill(d, x, y, z, dx, dy, dz, dx2, dy2, dz2, dx3, dy3, dz3):
+        nonlocal index
+        if d == 1:
+            curve[int(z)][int(x)][int(y)] = index
+            index += 1
+            return
+        d /= 2
+        if dx < 0: x -= d * dx
+        if dy < 0: y -= d * dy
+        if dz < 0: z -= d * dz
+        if dx2 < 0: x -= d * dx2
+        if dy2 < 0: y -= d * dy2
+        if dz2 < 0: z -= d * dz2
+        if dx3 < 0: x -= d * dx3
+        if dy3 < 0: y -= d * dy3
+        if dz3 < 0: z -= d * dz3
+        fill(d, x, y, z, dx2, dy2, dz2, dx3, dy3, dz3, dx, dy, dz)
+        fill(d, x + d * dx, y + d * dy, z + d * dz, dx3, dy3, dz3, dx, dy, dz, dx2, dy2, dz2)
+        fill(d, x + d * dx + d * dx2, y + d * dy + d * dy2, z + d * dz + d * dz2,
+             dx3, dy3, dz3, dx, dy, dz, dx2, dy2, dz2)
+        fill(d, x + d * dx2, y + d * dy2, z + d * dz2, -dx, -dy, -dz, -dx2, -dy2, -dz2, dx3, dy3, dz3)
+        fill(d, x + d * dx2 + d * dx3, y + d * dy2 + d * dy3, z + d * dz2 + d * dz3,
+             -dx, -dy, -dz, -dx2, -dy2, -dz2, dx3, dy3, dz3)
+        fill(d, x + d * dx + d * dx2 + d * dx3, y + d * dy + d * dy2 + d * dy3, z + d * dz + d * dz2 + d * dz3,
+             -dx3, -dy3, -dz3, dx, dy, dz, -dx2, -dy2, -dz2)
+        fill(d, x + d * dx + d * dx3, y + d * dy + d * dy3, z + d * dz + d * dz3,
+             -dx3, -dy3, -dz3, dx, dy, dz, -dx2, -dy2, -dz2)
+        fill(d, x + d * dx3, y + d * dy3, z + d * dz3, dx2, dy2, dz2, -dx3, -dy3, -dz3, -dx, -dy, -dz)
+
+    fill(dim, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1)
+    return curve
+
+
+class SpatialCodec:
+
+    def __init__(self, dim: int, hardware_map: Sequence):
+        """
+        Precompute the encoding permutations for a transmitter
+
+        :param dim: cube dimension of the transmitter
+        :type dim: int
+        :param hardware_map: dim x dim x dim matrix of transmitter pin indices for each voxel
+        :type hardware_map: Sequence
+        :raises ValueError: if `dim` is not a power of 2 or the hardware map does not match it
+        """
+        self.dim = dim
+        self.frame_bits = pow(dim, 3)
+        h_map = np.asarray(hardware_map, dtype=np.intp)
+        if h_map.shape != (dim, dim, dim):
+            raise ValueError("hardware map does not match cube dimension {}".format(dim))
+        # spatial maps for each access point, rotations about the vertical axis of the curve
+        maps = [hilbert_curve(dim)]
+        for _ in range(1, ACCESS_POINTS):
+            maps.append(np.ascontiguousarray(np.flip(np.swapaxes(maps[-1], 1, 2), axis=2)))
+        self._maps: List[np.ndarray] = [m.ravel() for m in maps]
+        # voxel driven by each transmitter pin
+        voxels = np.empty(self.frame_bits, dtype=np.intp)
+        voxels[h_map.ravel()] = np.arange(self.frame_bits)
+        # pin order of frame bits encoded for each access point
+        self._hardware = [m[voxels] for m in self._maps]
+        # byte lookup tables of the hardware permutations, built on first use by `hardware`
+        self._tables: Dict[int, np.ndarray] = {}
+        # bits decoded at access point r from a frame encoded for access point a
+        self._views: List[List[np.ndarray]] = []
+        for a in range(ACCESS_POINTS):
+            views = []
+            for r in range(ACCESS_POINTS):
+                view = np.empty(self.frame_bits, dtype=np.intp)
+                view[self._maps[r]] = self._maps[a]
+                views.append(view)
+            self._views.append(views)
+
+    def encode(self, frame: bytes, ap: int) -> Tuple[bytes, Tuple[bytes, ...]]:
+        """
+        Encode a frame for an access point
+
+        :param frame: dim³ bits of frame data, shorter frames are padded with null bits
+        :type frame: bytes
+        :param ap: index of the access point the frame is encoded for
+        :type ap: int
+        :return: hardware mapped frame for the transmitter and the frame decoded by a receiver at
+        each access point
+        :rtype: Tuple[bytes, Tuple[bytes, ...]]
+        """
+        bits = np.unpackbits(np.frombuffer(frame, dtype=np.uint8), count=self.frame_bits)
+        hardware = np.packbits(bits[self._hardware[ap]]).tobytes()
+        views = tuple(np.packbits(bits[view]).tobytes() for view in self._views[ap])
+        return hardware, views
+
+    def hardware(self, frames: bytes, ap: int) -> bytes:
+        """
+        Hardware mapped form of several frames encoded for an access point at once
+
+        :param frames: whole frames of dim³ bits
+        :type frames: bytes
+        :param ap: index of the access point the frames are encoded for
+        :type ap: int
+        :return: hardware mapped frames in order
+        :rtype: bytes
+        """
+        tables = self._tables.get(ap)
+        if tables is None: tables = self._tables[ap] = self._byte_tables(self._hardware[ap])
+        data = np.frombuffer(frames, dtype=np.uint8).reshape(-1, self.frame_bits // 8)
+        encoded = tables[0][data[:, 0]]
+        for k in range(1, data.shape[1]): encoded |= tables[k][data[:, k]]
+        return encoded.tobytes()
+
+    def _byte_tables(self, permutation: np.ndarray) -> np.ndarray:
+        # contribution of every value of each frame byte to the permuted frame, permuting a frame is
+        # then one lookup per byte instead of one per bit
+        size = self.frame_bits // 8
+        tables = np.empty((size, 256, size), dtype=np.uint8)
+        values = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)
+        for k in range(size):
+            bits = np.zeros((256, self.frame_bits), dtype=np.uint8)
+            bits[:, k * 8:(k + 1) * 8] = values
+            tables[k] = np.packbits(bits[:, permutation], axis=1)
+        return tables
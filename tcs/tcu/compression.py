@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Payload Compression
+===================
+Modified: 2021-06
+
+Streaming compression of a payload ahead of frame segmentation. Every frame slot displayed on the
+cube is expensive, so payloads of compressible data such as text are compressed with zlib or lzma
+before they are cut into frames.
+
+The first chunk of a payload is compressed on its own as a probe. If the probe does not shrink it
+below `COMPRESSION_THRESHOLD` of its size the payload is taken to be incompressible and passes
+through unchanged. The outcome depends only on the payload and its chunking so a receiver holding
+the same chunks reproduces it exactly.
+
+Dependencies
+------------
+```
+import lzma
+import zlib
+from typing import Optional
+
+from tcs.tcu.config import TCUConfig as tc
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import lzma
+import zlib
+from typing import Optional
+
+from tcs.tcu.config import TCUConfig as tc
+
+METHODS = ('zlib', 'lzma')
+
+
+class Compressor:
+
+    def __init__(self, method: str, level: int = tc.COMPRESSION_LEVEL, threshold: float = tc.COMPRESSION_THRESHOLD):
+        """
+        :param method: compression method, one of `METHODS`
+        :type method: str
+        :param level: zlib compression level or lzma preset
+        :type level: int
+        :param threshold: largest probe ratio at which the payload is compressed
+        :type threshold: float
+        :raises ValueError: if the method is not supported
+        """
+        if method not in METHODS: raise ValueError("unsupported compression method: {}".format(method))
+        self.method = method
+        self.level = level
+        self.threshold = threshold
+        # decided by the probe of the first chunk
+        self.enabled: Optional[bool] = None
+        self.raw = 0
+        self.compressed = 0
+        self._stream = zlib.compressobj(level) if method == 'zlib' else lzma.LZMACompressor(preset=level)
+
+    def __repr__(self) -> str:
+        return "{} ({})".format(self.method, "enabled" if self.enabled else "skipped")
+
+    @property
+    def ratio(self) -> float:
+        return self.compressed / self.raw if self.raw else 1.0
+
+    def compress(self, chunk: bytes, final: bool = False) -> bytes:
+        """
+        Compress the next chunk of the payload
+
+        :param chunk: payload chunk
+        :type chunk: bytes
+        :param final: whether this is the last chunk of the payload
+        :type final: bool
+        :return: compressed bytes ready for segmentation, may be empty until the stream is flushed
+        :rtype: bytes
+        """
+        if self.enabled is None and chunk:
+            if self.method == 'zlib': probe = zlib.compress(chunk, self.level)
+            else: probe = lzma.compress(chunk, preset=self.level)
+            self.enabled = len(probe) < self.threshold * len(chunk)
+        self.raw += len(chunk)
+        if self.enabled:
+            chunk = self._stream.compress(chunk)
+            if final: chunk += self._stream.flush()
+        self.compressed += len(chunk)
+        return chunk
@@ -1,6 +1,53 @@
+import os
+
+
 class TCUConfig:
     """Transmission control unit constants class"""
     BAUD_RATE = 9600
+    # serial line bits per byte for 8N1 framing (start + 8 data + stop)
+    BITS_PER_BYTE = 10
     WRITE_TIMEOUT = 5
     DEFAULT_PORT = "/dev/ttyUSB0"
+    DEFAULT_TRANSMITTER = "serial"
     IDLE_SLEEP = 1
+    # maximum time to hold a frame while waiting for the receiver uplink
+    UPLINK_TIMEOUT = 100
+    # transmitter cube dimension, each frame carries DIM³ bits
+    DIM = int(os.environ.get('DIM', 4))
+    # bytes displayed per frame
+    FRAME_SIZE = pow(DIM, 3) // 8
+    # Hardware maps of transmitter pin indices per voxel
+    # Bottom Layer 0    Middle Layer 1    Middle Layer 2    Top Layer 3
+    # --------------    --------------    --------------    -----------
+    # 12 13 14 15       28 29 30 31       44 45 46 47       60 61 62 63
+    # 8  9  10 11       24 25 26 27       40 41 42 43       56 57 58 59
+    # 4  5  6  7        20 21 22 23       36 37 38 39       52 53 54 55
+    # 0  1  2  3        16 17 18 19       32 33 34 35       48 49 50 51
+    HARDWARE_MAPS = {
+        2: [[[2, 3], [0, 1]], [[6, 7], [4, 5]]],
+        4: [
+            [[12, 13, 14, 15], [8, 9, 10, 11], [4, 5, 6, 7], [0, 1, 2, 3]],
+            [[28, 29, 30, 31], [24, 25, 26, 27], [20, 21, 22, 23], [16, 17, 18, 19]],
+            [[44, 45, 46, 47], [40, 41, 42, 43], [36, 37, 38, 39], [32, 33, 34, 35]],
+            [[60, 61, 62, 63], [56, 57, 58, 59], [52, 53, 54, 55], [48, 49, 50, 51]],
+        ],
+    }
+    # frame queue bounds in bytes, producers pause at the high watermark and resume at the low
+    QUEUE_SIZE = 1 << 20
+    HIGH_WATERMARK = 1 << 16
+    LOW_WATERMARK = 1 << 14
+    # payload frame rate bounds per access point in frames per second
+    RATE_INITIAL = 10.0
+    RATE_MIN = 0.2
+    RATE_MAX = 100.0
+    # additive increase per clean response and multiplicative decrease of the frame rate
+    RATE_STEP = 0.5
+    RATE_DECREASE = 0.5
+    # retransmission rates below which the frame rate is raised and above which it is cut
+    NACK_LOW = 0.05
+    NACK_HIGH = 0.2
+    # seconds after a decrease before the frame rate may be cut again
+    RATE_HOLD = 1.0
+    # compression level of payloads and the probe ratio above which a payload is sent uncompressed
+    COMPRESSION_LEVEL = 6
+    COMPRESSION_THRESHOLD = 0.9
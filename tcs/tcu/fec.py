@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Forward Error Correction
+========================
+Modified: 2021-06
+
+Systematic Hamming(2^r - 1, 2^r - 1 - r) code applied at frame segmentation. Each frame of dim³ bits
+carries as many codewords as fit, every codeword corrects a single flipped bit, so a receiver can
+repair small capture errors locally instead of requesting a retransmission. Larger `r` spends fewer
+bits on parity at the cost of correcting fewer errors per frame.
+
+Payloads are cut into blocks of `data_size` bytes, one block per frame. Codewords are laid out as the
+data bits followed by the parity bits and the remainder of the frame is padded with null bits.
+Encoding and decoding operate on every codeword of a payload at once.
+
+Dependencies
+------------
+```
+import numpy as np
+from typing import Tuple
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import numpy as np
+from typing import Tuple
+
+
+class HammingCode:
+
+    def __init__(self, r: int, frame_bits: int):
+        """
+        :param r: parity bits per codeword
+        :type r: int
+        :param frame_bits: bits per frame
+        :type frame_bits: int
+        :raises ValueError: if `r` is less than 2 or a frame cannot carry a byte of data
+        """
+        if r < 2: raise ValueError("hamming codes require at least 2 parity bits")
+        self.r = r
+        self.n = pow(2, r) - 1
+        self.k = self.n - r
+        self.frame_bits = frame_bits
+        self.frame_size = frame_bits // 8
+        # data bytes carried by each frame and the codewords used to carry them
+        self.data_size = frame_bits // self.n * self.k // 8
+        if not self.data_size:
+            raise ValueError("{} bit frames cannot carry hamming({}, {}) codewords".format(frame_bits, self.n, self.k))
+        self.words = -(-self.data_size * 8 // self.k)
+        # parity check columns of the data bits, every r bit value that is not a power of 2
+        columns = np.array([v for v in range(1, self.n + 1) if v & (v - 1)], dtype=np.intp)
+        self._parity = ((columns[:, None] >> np.arange(r)) & 1).astype(np.uint8)
+        # codeword bit position of each syndrome, -1 for the zero syndrome of a valid codeword
+        self._positions = np.full(self.n + 1, -1, dtype=np.intp)
+        self._positions[columns] = np.arange(self.k)
+        self._positions[1 << np.arange(r)] = self.k + np.arange(r)
+        self._weights = (1 << np.arange(r)).astype(np.intp)
+
+    def __repr__(self) -> str:
+        return "hamming({}, {})".format(self.n, self.k)
+
+    def frames(self, size: int) -> int:
+        """
+        Number of frames carrying a payload
+
+        :param size: payload length in bytes
+        :type size: int
+        :return: frame count
+        :rtype: int
+        """
+        return -(-size // self.data_size)
+
+    def encode(self, data: bytes) -> bytes:
+        """
+        Encode a payload into frames
+
+        :param data: payload, the final block is padded with null bytes
+        :type data: bytes
+        :return: `frame_size` bytes per block of the payload
+        :rtype: bytes
+        """
+        frames = self.frames(len(data))
+        block = np.frombuffer(data.ljust(frames * self.data_size, b'\x00'), dtype=np.uint8)
+        bits = np.unpackbits(block).reshape(frames, -1)
+        bits = np.pad(bits, ((0, 0), (0, self.words * self.k - bits.shape[1]))).reshape(frames, self.words, self.k)
+        # uint8 sums wrap modulo 256 which preserves their parity
+        parity = (bits @ self._parity) & 1
+        code = np.concatenate((bits, parity), axis=2).reshape(frames, -1)
+        code = np.pad(code, ((0, 0), (0, self.frame_bits - code.shape[1])))
+        return np.packbits(code, axis=1).tobytes()
+
+    def decode(self, frames: bytes) -> Tuple[bytes, int]:
+        """
+        Correct and decode captured frames
+
+        :param frames: whole frames of `frame_size` bytes
+        :type frames: bytes
+        :return: decoded data blocks and the number of corrected bits
+        :rtype: Tuple[bytes, int]
+        """
+        bits = np.unpackbits(np.frombuffer(frames, dtype=np.uint8)).reshape(-1, self.frame_bits)
+        count = bits.shape[0]
+        code = bits[:, :self.words * self.n].reshape(count, self.words, self.n)
+        syndrome = ((code[..., :self.k] @ self._parity) ^ code[..., self.k:]) & 1
+        errors = self._positions[syndrome.astype(np.intp) @ self._weights]
+        frame, word = np.nonzero(errors >= 0)
+        code[frame, word, errors[frame, word]] ^= 1
+        data = code[..., :self.k].reshape(count, -1)[:, :self.data_size * 8]
+        return np.packbits(data, axis=1).tobytes(), len(frame)
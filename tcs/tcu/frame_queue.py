@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Frame Queue
+===========
+Modified: 2021-06
+
+FIFO queue of payload buffers. Payloads are stored whole and frames are handed out as `memoryview`
+slices of `frame_size` bytes so enqueueing a payload costs a single append regardless of its size.
+Each payload carries a tag, such as the access point it is encoded for, which is returned with each
+of its frames. The payloads of a tag can be discarded, such as those of a receiver that disconnected.
+
+The queue is bounded and applies backpressure with a pair of watermarks. Once the queued bytes reach
+the high watermark the queue pauses its producers, which wait in `push` until the consumer drains it
+to the low watermark. Producers may run on any thread or event loop. `push` checks for room and
+appends a payload atomically, so producers woken together at the low watermark cannot overflow the
+queue.
+
+Dependencies
+------------
+```
+import time
+import asyncio
+import logging
+from queue import Empty, Full
+from threading import Lock
+from collections import deque
+from typing import Any, Deque, List, Tuple, Union
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import time
+import asyncio
+import logging
+from queue import Empty, Full
+from threading import Lock
+from collections import deque
+from typing import Any, Deque, List, Tuple, Union
+
+from tcs.tcu.config import TCUConfig as tc
+
+
+class FrameQueue:
+
+    def __init__(self, frame_size: int, high_watermark: int = tc.HIGH_WATERMARK,
+                 low_watermark: int = tc.LOW_WATERMARK, maxsize: int = tc.QUEUE_SIZE):
+        if not 0 <= low_watermark < high_watermark <= maxsize:
+            raise ValueError("watermarks must satisfy 0 <= low < high <= maxsize")
+        self._log = logging.getLogger(__name__)
+        self.frame_size = frame_size
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.maxsize = maxsize
+        self.paused = False
+        self._paused_at = 0.0
+        self._paused_time = 0.0
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._payloads: Deque[Tuple[memoryview, Any]] = deque()
+        self._offset = 0  # read offset into the payload at the head of the queue
+        self._depth = 0  # bytes queued and not yet handed out
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        """
+        Number of frames remaining in the queue
+
+        :return: frame count
+        :rtype: int
+        """
+        with self._lock:
+            return sum(-(-len(p) // self.frame_size) for p, _ in self._payloads) - self._offset // self.frame_size
+
+    @property
+    def depth(self) -> int:
+        """
+        Number of payload bytes remaining in the queue
+
+        :return: queue depth in bytes
+        :rtype: int
+        """
+        return self._depth
+
+    @property
+    def paused_time(self) -> float:
+        """
+        Total time producers have spent paused, including the current pause
+
+        :return: paused time in seconds
+        :rtype: float
+        """
+        if self.paused: return self._paused_time + time.perf_counter() - self._paused_at
+        return self._paused_time
+
+    def empty(self) -> bool:
+        return self._depth == 0
+
+    async def push(self, data: Union[bytes, bytearray, memoryview], tag: Any = None) -> None:
+        """
+        Append a payload without copying it once the queue has room for it, waiting while the queue
+        is paused. A payload that does not fit pauses the queue until it drains to the low watermark.
+        The caller must not mutate the buffer after it has been queued.
+
+        :param data: payload buffer
+        :type data: Union[bytes, bytearray, memoryview]
+        :param tag: value returned alongside each frame of the payload
+        :type tag: Any
+        :raises Full: if the payload does not fit above the low watermark
+        """
+        view = memoryview(data).cast('B')
+        if not len(view): return
+        if len(view) > self.maxsize - self.low_watermark: raise Full
+        while True:
+            with self._lock:
+                if not self.paused and self._depth + len(view) <= self.maxsize:
+                    self._append(view, tag)
+                    return
+                if not self.paused: self._pause()
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            await waiter
+
+    def _append(self, view: memoryview, tag: Any) -> None:
+        # called with the lock held
+        self._payloads.append((view, tag))
+        self._depth += len(view)
+        if not self.paused and self._depth >= self.high_watermark: self._pause()
+
+    def _pause(self) -> None:
+        # called with the lock held
+        self.paused = True
+        self._paused_at = time.perf_counter()
+        self._log.info("Frame queue paused producers at %s bytes", self._depth)
+
+    def get(self) -> Tuple[memoryview, Any]:
+        """
+        Take the next frame off the queue. The final frame of a payload is shorter than
+        `frame_size` if the payload length is not a multiple of it.
+
+        :raises Empty: if the queue is empty
+        :return: zero-copy view of the next frame and the tag of its payload
+        :rtype: Tuple[memoryview, Any]
+        """
+        with self._lock:
+            if not self._payloads: raise Empty
+            payload, tag = self._payloads[0]
+            frame = payload[self._offset:self._offset + self.frame_size]
+            self._offset += len(frame)
+            if self._offset == len(payload):
+                self._payloads.popleft()
+                self._offset = 0
+            self._depth -= len(frame)
+            if self.paused and self._depth <= self.low_watermark: self._resume()
+        return frame, tag
+
+    def discard(self, tag: Any) -> int:
+        """
+        Remove the payloads queued with a tag, including the remainder of a payload partly handed out
+
+        :param tag: tag the payloads were pushed with
+        :type tag: Any
+        :return: number of payload bytes removed
+        :rtype: int
+        """
+        with self._lock:
+            removed = 0
+            kept: Deque[Tuple[memoryview, Any]] = deque()
+            for i, (payload, payload_tag) in enumerate(self._payloads):
+                if payload_tag != tag: kept.append((payload, payload_tag))
+                else: removed += len(payload) - (self._offset if i == 0 else 0)
+            if not removed: return 0
+            if self._payloads[0][1] == tag: self._offset = 0
+            self._payloads = kept
+            self._depth -= removed
+            if self.paused and self._depth <= self.low_watermark: self._resume()
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._payloads.clear()
+            self._offset = 0
+            self._depth = 0
+            if self.paused: self._resume()
+
+    def _resume(self) -> None:
+        # called with the lock held
+        paused = time.perf_counter() - self._paused_at
+        self._paused_time += paused
+        self.paused = False
+        waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(self._wake, waiter)
+            except RuntimeError:
+                pass  # producer event loop has already closed
+        self._log.info("Frame queue drained to %s bytes, resumed %s producers after %.3fs",
+                       self._depth, len(waiters), paused)
+
+    @staticmethod
+    def _wake(waiter: asyncio.Future) -> None:
+        if not waiter.done(): waiter.set_result(None)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Rate Controller
+===============
+Modified: 2021-06
+
+Closed loop control of the payload frame rate displayed to a receiver. The controller is fed the
+retransmission rate of the receiver sessions and adjusts the frame rate additive increase,
+multiplicative decrease (AIMD): while the receiver captures cleanly the rate is raised by a fixed
+step per response, once capture failures climb past the high threshold it is cut by a factor. Cuts
+are held off for `RATE_HOLD` seconds so that the failures of frames already displayed at the old
+rate do not compound the decrease.
+
+Dependencies
+------------
+```
+import asyncio
+import time
+
+from tcs.tcu.config import TCUConfig as tc
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import asyncio
+import time
+
+from tcs.tcu.config import TCUConfig as tc
+
+
+class RateController:
+
+    def __init__(self, rate: float = tc.RATE_INITIAL, minimum: float = tc.RATE_MIN, maximum: float = tc.RATE_MAX,
+                 step: float = tc.RATE_STEP, decrease: float = tc.RATE_DECREASE):
+        """
+        :param rate: initial frame rate in frames per second
+        :type rate: float
+        :param minimum: lowest frame rate
+        :type minimum: float
+        :param maximum: highest frame rate
+        :type maximum: float
+        :param step: frames per second added per clean response
+        :type step: float
+        :param decrease: factor applied to the frame rate when capture failures climb
+        :type decrease: float
+        """
+        self.rate = rate
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.decrease = decrease
+        # rate decisions taken
+        self.increases = 0
+        self.decreases = 0
+        self._hold = 0.0  # time before which the rate is not cut again
+        self._next = 0.0  # earliest time of the next frame
+
+    def update(self, nack_rate: float) -> float:
+        """
+        Adjust the frame rate to the retransmission rate fed back by the receiver
+
+        :param nack_rate: smoothed ratio of capture failures to responses
+        :type nack_rate: float
+        :return: frame rate in frames per second
+        :rtype: float
+        """
+        now = time.monotonic()
+        if nack_rate > tc.NACK_HIGH and now >= self._hold:
+            self.rate = max(self.rate * self.decrease, self.minimum)
+            self.decreases += 1
+            self._hold = now + tc.RATE_HOLD
+        elif nack_rate < tc.NACK_LOW and self.rate < self.maximum:
+            self.rate = min(self.rate + self.step, self.maximum)
+            self.increases += 1
+        return self.rate
+
+    async def pace(self) -> None:
+        """
+        Wait for the next frame slot at the current frame rate
+        """
+        now = time.monotonic()
+        if self._next > now: await asyncio.sleep(self._next - now)
+        self._next = max(now, self._next) + 1 / self.rate
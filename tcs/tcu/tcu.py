@@ -4,85 +4,185 @@ LEAP™ Transmission Control Unit
 ===============================
 Modified: 2021-06
 
+Each `TransmissionControlUnit` drives one transmitter and is addressed by its channel index. Events
+carry the target channel so that several units can share the event registry, each ignoring events
+for other channels. Serial writes run in the default executor so that the units of a process write
+to their transmitters in parallel.
+
+After a payload frame is transmitted the unit holds the display until the receiver session grants
+an uplink credit. Sessions grant one credit per acknowledged frame and open their window by granting
+additional credits up front, which lets the unit run that many frames ahead of the acknowledgments.
+Credits are kept per session and frames are queued tagged with their session. Once a session closes
+its queued frames are discarded and its credits dropped, releasing a frame held on its behalf, so a
+receiver that disconnects mid transfer does not stall the channel.
+Sessions also feed back their retransmission rate, which drives a `RateController` per access point
+pacing the payload frames displayed to the receivers there. The paced frame rate is published to the
+`SessionTable` entry of the session that fed it back and exported with the rate decisions as metrics.
+
+Payloads are segmented into frames of dim³ bits by the frame queue. On transmit each frame is
+spatially encoded for the access point of the session it belongs to, written to the transmitter in
+its hardware mapped form and the digest of the frame decoded at every access point is posted to the
+`FrameCache` for receiver registration.
+
 Copyright © 2021 LEAP. All Rights Reserved.
 """
 
-import serial
+import time
 import asyncio
 import logging
 import random
-from queue import Queue
-from threading import Condition
+from queue import Full
+from typing import Dict, Optional, Union
 
+from tcs.log import Hex
 from tcs.event.registry import Registry as events
 from tcs.tcu.config import TCUConfig as tc
-from tcs.cache.cache import FrameCache
+from tcs.tcu.transmitter import Transmitter
+from tcs.tcu.frame_queue import FrameQueue
+from tcs.tcu.codec import SpatialCodec
+from tcs.tcu.rate import RateController
+from tcs.cache.cache import AccessPoint, FrameCache
+from tcs.tcp.status import SessionTable as sessions
+from tcs.metrics.registry import Registry as metrics
 
 
 class TransmissionControlUnit:
 
-    def __init__(self, port=tc.DEFAULT_PORT):
+    def __init__(self, transmitter: Transmitter, channel: int = 0):
         self._log = logging.getLogger(__name__)
         # Data type field initialization
-        self.port = port
-        self.sleep = False
-        self.next_condition = Condition()
+        self.transmitter = transmitter
+        self.channel = channel
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._uplink: Optional[asyncio.Event] = None
+        # frames the unit may transmit ahead of the acknowledgments of each open session
+        self._credits: Dict[int, int] = {}
+        # session of the frame being displayed, None once that session has been released
+        self._current: Optional[int] = None
+        # payload frame rate control of each access point
+        self.rates: Dict[int, RateController] = {}
         # event registration
         events.transmit.register(self.transmit)
         events.enqueue.register(self.enqueue)
         events.uplink.register(self.uplink)
-        self.frame_queue: Queue[bytes] = Queue()
-        # initialize arduino serial connection
+        events.feedback.register(self.feedback)
+        events.release.register(self.release)
+        self.frame_queue = FrameQueue(tc.FRAME_SIZE)
+        self.codec = SpatialCodec(tc.DIM, tc.HARDWARE_MAPS[tc.DIM])
+        # metrics of this channel
+        self._frames = metrics.frames_transmitted.labels(channel)
+        self._idle_frames = metrics.idle_frames.labels(channel)
+        self._timeouts = metrics.write_timeouts.labels(channel)
+        self._write_latency = metrics.write_latency.labels(channel)
+        metrics.queue_depth.labels(channel).set_function(lambda: self.frame_queue.depth)
+        metrics.queue_paused_time.labels(channel).set_function(lambda: self.frame_queue.paused_time)
+        self._log.info("%s successfully instantiated on channel %s with %s", __name__, channel, transmitter)
+
+    async def enqueue(self, data: bytes, ap: AccessPoint, session: int) -> None:
+        if ap.channel != self.channel: return
+        # block the producer until the queue has room for the payload
         try:
-            self.ser = serial.Serial(port=self.port,
-                                     baudrate=tc.BAUD_RATE,
-                                     write_timeout=tc.WRITE_TIMEOUT)
-        except serial.SerialException as exc:
-            self._log.exception(
-                "TCU initialization failed. Unable to establish serial connection at port: %s.",
-                self.port)
-            raise IOError from exc  # for clarity
-        self._log.info("%s successfully instantiated", __name__)
-
-    async def enqueue(self, data: bytes) -> None:
-        # can we iterate through bytes returning bytes and not ints?
-        for i in data:
-            b = i.to_bytes(1, byteorder='little')
-            self.frame_queue.put(b)
-        self._log.info("Queued payload: %s", data)
-        while self.sleep:
-            self._log.info("Entering backoff state, waiting for main event loop")
-            await asyncio.sleep(1)
-
-    async def uplink(self) -> None:
-        with self.next_condition:
-            self.next_condition.notify()
-        self._log.info("Notified tcu runner for new frame")
+            await self.frame_queue.push(data, (ap.index, session))
+        except Full:
+            self._log.error("Dropped payload of %s bytes on channel %s larger than the frame queue", len(data),
+                            self.channel)
+            raise
+        self._log.info("Queued payload of %s bytes on channel %s, queue depth: %s bytes",
+                       len(data), self.channel, self.frame_queue.depth)
+
+    async def uplink(self, channel: int, session: int, frames: int = 1) -> None:
+        if channel != self.channel or self._loop is None: return
+        # uplinks may be executed from other threads, grant credits on the runner loop
+        self._loop.call_soon_threadsafe(self._grant, session, frames)
+        self._log.info("Notified tcu runner on channel %s for %s frames of session %s", self.channel, frames, session)
+
+    async def release(self, ap: AccessPoint, session: int) -> None:
+        if ap.channel != self.channel or self._loop is None: return
+        # released after the credits the session granted before it closed
+        self._loop.call_soon_threadsafe(self._release, ap.index, session)
+
+    async def feedback(self, ap: AccessPoint, session: int, rate: float) -> None:
+        if ap.channel != self.channel: return
+        self._log.debug("Session %s at access point %s retransmission rate: %.3f", session, ap.index, rate)
+        control = self._rate(ap.index)
+        previous, increases, decreases = control.rate, control.increases, control.decreases
+        if control.update(rate) != previous:
+            self._log.info("Frame rate on channel %s access point %s set to %.2f fps at retransmission rate %.3f",
+                           self.channel, ap.index, control.rate, rate)
+        if control.increases != increases:
+            metrics.rate_increases.labels(self.channel, ap.index).inc(control.increases - increases)
+        if control.decreases != decreases:
+            metrics.rate_decreases.labels(self.channel, ap.index).inc(control.decreases - decreases)
+        status = sessions.get(session)
+        if status is not None: status.frame_rate = control.rate
+
+    def _rate(self, ap: int) -> RateController:
+        control = self.rates.get(ap)
+        if control is None:
+            control = self.rates[ap] = RateController()
+            metrics.frame_rate.labels(self.channel, ap).set_function(lambda: control.rate)
+        return control
+
+    def _grant(self, session: int, frames: int) -> None:
+        credits = self._credits[session] = self._credits.get(session, 0) + frames
+        if session == self._current and credits >= 0: self._uplink.set()
+
+    def _release(self, ap: int, session: int) -> None:
+        self._credits.pop(session, None)
+        discarded = self.frame_queue.discard((ap, session))
+        if discarded:
+            self._log.info("Discarded %s queued bytes of closed session %s on channel %s", discarded, session,
+                           self.channel)
+        if session == self._current:
+            # stop holding the display for a receiver that is gone
+            self._current = None
+            self._uplink.set()
 
     async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._uplink = asyncio.Event()
         while True:
             # perform idle action if queue is empty
             if self.frame_queue.empty():
-                bytestream = bytes([random.randint(0, 255)])
-                await self.transmit(bytestream)
-                self.sleep = True
+                bytestream = random.getrandbits(self.codec.frame_bits).to_bytes(tc.FRAME_SIZE, 'big')
+                await self.transmit(bytestream, self.channel)
+                self._idle_frames.inc()
                 await asyncio.sleep(tc.IDLE_SLEEP)
-                self.sleep = False
             else:
                 # get new item from the queue
-                bytestream = self.frame_queue.get()
-                await self.transmit(bytestream)
-                with self.next_condition:
-                    self.next_condition.wait(timeout=100)
+                bytestream, (ap, session) = self.frame_queue.get()
+                self._current = session
+                await self._rate(ap).pace()
+                await self.transmit(bytestream, self.channel, ap)
+                self._frames.inc()
+                # the session may have been released while its frame was displayed
+                if self._current is None: continue
+                credits = self._credits[session] = self._credits.get(session, 0) - 1
+                if credits >= 0: continue
+                # receiver window is full, hold the frame until an uplink credit arrives or the session is released
+                self._uplink.clear()
+                try:
+                    await asyncio.wait_for(self._uplink.wait(), timeout=tc.UPLINK_TIMEOUT)
+                except asyncio.TimeoutError:
+                    self._log.warning("No uplink received on channel %s, advancing frame", self.channel)
+                    self._credits[session] = 0
+                finally:
+                    self._current = None
 
-    async def transmit(self, data: bytes) -> None:
+    async def transmit(self, data: Union[bytes, memoryview], channel: int, ap: int = 0) -> None:
+        if channel != self.channel: return
+        hardware, views = self.codec.encode(data, ap)
+        start = time.perf_counter()
         try:
-            self.ser.write(data)
+            await asyncio.get_running_loop().run_in_executor(None, self.transmitter.write, hardware)
         # Purge scheduler and reboot transmitter
-        except serial.SerialTimeoutException as exc:
+        except TimeoutError as exc:
+            self._timeouts.inc()
             self._log.exception("Frame write to transmitter timed out: %s", exc)
         else:
+            self._write_latency.observe(time.perf_counter() - start)
             # cache frame
             with FrameCache() as fc:
-                fc.post(data)
-            self._log.info("Successfully wrote %s to tesseract", data)
+                for index, view in enumerate(views):
+                    fc.post(view, self.channel, index)
+            self._log.info("Successfully wrote %s to tesseract on channel %s", Hex(data), self.channel)
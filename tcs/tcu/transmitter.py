@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Transmitter Backends
+====================
+Modified: 2021-06
+
+Pluggable output devices for the transmission control unit. The `SerialTransmitter` drives the
+arduino over a serial link. `LoopbackTransmitter` writes to a pseudo terminal and blocks for the
+time the arduino would take to clock the frame in at `TCUConfig.BAUD_RATE`. `NullTransmitter`
+discards frames immediately and is used to measure the maximum throughput of the pipeline.
+
+Dependencies
+------------
+```
+import os
+import time
+import logging
+from abc import ABC, abstractmethod
+from threading import Thread
+from typing import Dict, Type
+```
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import os
+import time
+import logging
+from abc import ABC, abstractmethod
+from threading import Thread
+from typing import Dict, Type
+
+from tcs.tcu.config import TCUConfig as tc
+
+
+class Transmitter(ABC):
+    """Base class for transmitter backends"""
+
+    def __init__(self, port: str):
+        self._log = logging.getLogger(__name__)
+        self.port = port
+
+    def __repr__(self) -> str:
+        return "{}({})".format(type(self).__name__, self.port)
+
+    @abstractmethod
+    def write(self, data: bytes) -> int:
+        """
+        Write a frame to the transmitter
+
+        :param data: hardware mapped frame
+        :type data: bytes
+        :raises TimeoutError: if the frame could not be written within `TCUConfig.WRITE_TIMEOUT`
+        :return: number of bytes written
+        :rtype: int
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class SerialTransmitter(Transmitter):
+    """Arduino transmitter connected over a serial port"""
+
+    def __init__(self, port: str = tc.DEFAULT_PORT):
+        super().__init__(port)
+        import serial
+        self._timeout_exc = serial.SerialTimeoutException
+        try:
+            self.ser = serial.Serial(port=self.port,
+                                     baudrate=tc.BAUD_RATE,
+                                     write_timeout=tc.WRITE_TIMEOUT)
+        except serial.SerialException as exc:
+            self._log.exception("Unable to establish serial connection at port: %s.", self.port)
+            raise IOError from exc  # for clarity
+
+    def write(self, data: bytes) -> int:
+        try:
+            return self.ser.write(data)
+        except self._timeout_exc as exc:
+            raise TimeoutError from exc
+
+    def close(self) -> None:
+        self.ser.close()
+
+
+class LoopbackTransmitter(Transmitter):
+    """
+    Simulated arduino attached to a pseudo terminal. Writes block for the time taken to shift the
+    frame out at `TCUConfig.BAUD_RATE` (8N1 framing) and the slave end is drained by a reader
+    thread. The slave device path is logged so external tools can attach to it instead. The
+    `port` argument is ignored since the device is allocated by the pty.
+    """
+
+    def __init__(self, port: str = ''):
+        self._master, self._slave = os.openpty()
+        super().__init__(os.ttyname(self._slave))
+        self.byte_time = tc.BITS_PER_BYTE / tc.BAUD_RATE
+        Thread(name="loopback", target=self._drain, daemon=True).start()
+        self._log.info("Loopback transmitter attached to %s", self.port)
+
+    def _drain(self) -> None:
+        try:
+            while os.read(self._slave, 1024): pass
+        except OSError:
+            pass
+
+    def write(self, data: bytes) -> int:
+        duration = len(data) * self.byte_time
+        if duration > tc.WRITE_TIMEOUT: raise TimeoutError
+        deadline = time.perf_counter() + duration
+        written = os.write(self._master, data)
+        delay = deadline - time.perf_counter()
+        if delay > 0: time.sleep(delay)
+        return written
+
+    def close(self) -> None:
+        os.close(self._master)
+        os.close(self._slave)
+
+
+class NullTransmitter(Transmitter):
+    """Transmitter sink that discards every frame"""
+
+    def __init__(self, port: str = 'null'):
+        super().__init__(port)
+
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+TRANSMITTERS: Dict[str, Type[Transmitter]] = {
+    'serial': SerialTransmitter,
+    'loopback': LoopbackTransmitter,
+    'null': NullTransmitter,
+}
+
+
+def create(kind: str, port: str = '') -> Transmitter:
+    """
+    Construct a transmitter backend by name
+
+    :param kind: one of the keys of `TRANSMITTERS`
+    :type kind: str
+    :param port: device path passed to the backend, empty for the backend default
+    :type port: str
+    :raises ValueError: if `kind` is not a registered backend
+    :return: initialized transmitter
+    :rtype: Transmitter
+    """
+    if kind not in TRANSMITTERS:
+        raise ValueError("unknown transmitter: {}".format(kind))
+    if port: return TRANSMITTERS[kind](port)
+    return TRANSMITTERS[kind]()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Admission Control Unittest Suite
+================================
+Unittest cases validating the per client token buckets of `RateLimiter` and the `429` responses of
+the registration routes once a client exceeds its rate.
+
+Dependencies
+------------
+>>> import unittest
+>>> from unittest import mock
+>>> from tcs.api.admission import RateLimiter
+>>> from tcs.api.server import app
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import unittest
+from unittest import mock
+
+from tcs.api.admission import RateLimiter
+from tcs.api.server import app
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = RateLimiter(rate=2.0, burst=3, clients=16)
+        patcher = mock.patch('tcs.api.admission.time.monotonic', return_value=100.0)
+        self.monotonic = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst(self):
+        """A client may make `burst` requests at once, the next waits for a token"""
+        self.assertEqual([self.limiter.acquire('a') for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertEqual(self.limiter.acquire('a'), 0.5)
+
+    def test_refill(self):
+        """Buckets refill at `rate` tokens per second up to the burst"""
+        for _ in range(3): self.limiter.acquire('a')
+        self.monotonic.return_value += 0.25
+        self.assertEqual(self.limiter.acquire('a'), 0.25)
+        self.monotonic.return_value += 0.25
+        self.assertEqual(self.limiter.acquire('a'), 0.0)
+        self.monotonic.return_value += 60
+        self.assertEqual([self.limiter.acquire('a') for _ in range(4)], [0.0, 0.0, 0.0, 0.5])
+
+    def test_clients(self):
+        """Each client address has its own bucket"""
+        for _ in range(3): self.limiter.acquire('a')
+        self.assertEqual(self.limiter.acquire('b'), 0.0)
+        self.assertGreater(self.limiter.acquire('a'), 0.0)
+
+
+class TestAdmission(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch('tcs.api.server.limiter', RateLimiter(rate=0.5, burst=2))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = app.test_client()
+
+    def test_too_many_requests(self):
+        """Registrations past the burst of a client are refused with 429 and a Retry-After"""
+        for _ in range(2):
+            self.assertEqual(self.client.get('/v1/register', headers={'Apr': 'unknown'}).status_code, 401)
+        response = self.client.get('/v1/register', headers={'Apr': 'unknown'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.get_json(), {'message': 'too many requests'})
+        self.assertEqual(response.headers['Retry-After'], '2')
+        # batch registrations share the bucket of the client
+        response = self.client.post('/v1/register/batch', json={'apr': ['unknown']})
+        self.assertEqual(response.status_code, 429)
+
+    def test_other_routes(self):
+        """Routes other than registration are not rate limited"""
+        for _ in range(4):
+            self.assertEqual(self.client.get('/v1/sessions').status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Payload Catalog Unittest Suite
+==============================
+Unittest cases validating the change detection of `PayloadCatalog`, its background polling of the
+payload directory and its handling of a missing directory.
+
+Dependencies
+------------
+>>> import time
+>>> import shutil
+>>> import tempfile
+>>> import unittest
+>>> from pathlib import Path
+>>> from tcs.tcu.config import TCUConfig as tc
+>>> from tcs.file.catalog import PayloadCatalog
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from tcs.tcu.config import TCUConfig as tc
+from tcs.file.catalog import PayloadCatalog
+
+
+class TestPayloadCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.root = Path(self._directory.name)
+        self.payloads = self.root / 'payload'
+        self.payloads.mkdir()
+        self.path = self.root / 'payload.frames'
+        self.write('a.bin', 2)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def write(self, name: str, frames: int) -> None:
+        (self.payloads / name).write_bytes(bytes(range(frames * tc.FRAME_SIZE)))
+
+    def catalog(self) -> PayloadCatalog:
+        return PayloadCatalog(self.payloads, self.path, interval=0.05)
+
+    def wait(self, condition) -> None:
+        for _ in range(100):
+            if condition(): return
+            time.sleep(0.02)
+        self.fail("catalog did not reload")
+
+    def test_refresh(self):
+        """The store is recompiled only once a payload is added, changed or removed"""
+        catalog = self.catalog()
+        self.assertIsNone(catalog.store)
+        self.assertTrue(catalog.refresh())
+        self.assertFalse(catalog.refresh())
+        self.assertEqual(list(catalog.store.entries), ['a.bin'])
+        self.write('b.bin', 1)
+        self.assertTrue(catalog.refresh())
+        self.assertEqual(catalog.store.entries['b.bin'].count, 1)
+        self.write('b.bin', 3)
+        self.assertTrue(catalog.refresh())
+        self.assertEqual(catalog.store.entries['b.bin'].count, 3)
+        (self.payloads / 'a.bin').unlink()
+        self.assertTrue(catalog.refresh())
+        self.assertEqual(list(catalog.store.entries), ['b.bin'])
+        self.assertEqual(catalog.reloads, 4)
+
+    def test_resume(self):
+        """A catalog resumes from the store compiled by a previous one while the payloads are unchanged"""
+        self.catalog().refresh()
+        catalog = self.catalog()
+        self.assertIsNotNone(catalog.store)
+        self.assertFalse(catalog.refresh())
+
+    def test_poll(self):
+        """The background worker picks up changes to the payload directory"""
+        with self.catalog() as catalog:
+            self.wait(lambda: catalog.store is not None)
+            store = catalog.store
+            self.write('b.bin', 1)
+            self.wait(lambda: 'b.bin' in catalog.store.entries)
+            # readers holding the previous store keep a consistent view
+            self.assertNotIn('b.bin', store.entries)
+        self.assertEqual(catalog.reloads, 2)
+
+    def test_missing_directory(self):
+        """A missing payload directory is created on start and served as an empty catalog"""
+        shutil.rmtree(self.payloads)
+        with self.assertLogs('tcs.file.catalog', 'INFO') as logs:
+            with self.catalog() as catalog:
+                self.wait(lambda: catalog.store is not None)
+        self.assertTrue(self.payloads.is_dir())
+        self.assertEqual(len(catalog.store), 0)
+        self.assertTrue(any("Created payload directory" in line for line in logs.output))
+
+    def test_removed_directory(self):
+        """A payload directory removed while polling is reported once and picked up again once restored"""
+        with self.assertLogs('tcs.file.catalog', 'WARNING') as logs:
+            with self.catalog() as catalog:
+                self.wait(lambda: catalog.store is not None)
+                shutil.rmtree(self.payloads)
+                time.sleep(0.3)
+                self.payloads.mkdir()
+                self.write('b.bin', 1)
+                self.wait(lambda: list(catalog.store.entries) == ['b.bin'])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("not found", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
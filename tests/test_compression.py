@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Compression Unittest Suite
+==========================
+Unittest cases validating the probe of the first payload chunk and the streamed compression of
+`Compressor` for every supported method.
+
+Dependencies
+------------
+>>> import lzma
+>>> import zlib
+>>> import random
+>>> import unittest
+>>> from tcs.tcu.compression import METHODS, Compressor
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import lzma
+import zlib
+import random
+import unittest
+
+from tcs.tcu.compression import METHODS, Compressor
+
+DECOMPRESS = {'zlib': zlib.decompress, 'lzma': lzma.decompress}
+
+
+class TestCompressor(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(0)
+        self.text = b''.join(b'frame %d of a compressible payload\n' % i for i in range(400))
+        self.noise = bytes(self.random.getrandbits(8) for _ in range(4096))
+
+    def stream(self, compressor: Compressor, payload: bytes, chunk: int) -> bytes:
+        chunks = [payload[i:i + chunk] for i in range(0, len(payload), chunk)]
+        return b''.join(compressor.compress(c, i == len(chunks) - 1) for i, c in enumerate(chunks))
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            Compressor('bogus')
+
+    def test_roundtrip(self):
+        """A compressible payload streamed in chunks decompresses to the payload"""
+        for method in METHODS:
+            with self.subTest(method=method):
+                compressor = Compressor(method)
+                compressed = self.stream(compressor, self.text, 1000)
+                self.assertTrue(compressor.enabled)
+                self.assertEqual(DECOMPRESS[method](compressed), self.text)
+                self.assertEqual((compressor.raw, compressor.compressed), (len(self.text), len(compressed)))
+                self.assertLess(compressor.ratio, 0.5)
+
+    def test_probe_skips(self):
+        """A payload whose first chunk does not compress is passed through unchanged"""
+        for method in METHODS:
+            with self.subTest(method=method):
+                compressor = Compressor(method)
+                self.assertEqual(self.stream(compressor, self.noise + self.text, 1000), self.noise + self.text)
+                self.assertFalse(compressor.enabled)
+                self.assertEqual(compressor.ratio, 1.0)
+
+    def test_probe_first_chunk(self):
+        """Only the first non-empty chunk decides whether the payload is compressed"""
+        compressor = Compressor('zlib')
+        self.assertEqual(compressor.compress(b''), b'')
+        self.assertIsNone(compressor.enabled)
+        compressed = compressor.compress(self.text) + compressor.compress(self.noise, True)
+        self.assertTrue(compressor.enabled)
+        self.assertEqual(zlib.decompress(compressed), self.text + self.noise)
+
+    def test_threshold(self):
+        """The probe ratio must fall below the threshold for the payload to be compressed"""
+        compressor = Compressor('zlib', threshold=0.0)
+        self.assertEqual(self.stream(compressor, self.text, 1000), self.text)
+        self.assertFalse(compressor.enabled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Forward Error Correction Unittest Suite
+=======================================
+Unittest cases validating the Hamming frame code of `tcs.tcu.fec`: encoding, decoding and the
+correction of a single flipped bit per codeword.
+
+Dependencies
+------------
+>>> import random
+>>> import unittest
+>>> import numpy as np
+>>> from tcs.tcu.fec import HammingCode
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import random
+import unittest
+
+import numpy as np
+
+from tcs.tcu.fec import HammingCode
+
+
+def flip(frames: bytes, positions) -> bytes:
+    bits = np.unpackbits(np.frombuffer(frames, dtype=np.uint8))
+    bits[list(positions)] ^= 1
+    return np.packbits(bits).tobytes()
+
+
+class TestHammingCode(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(0)
+        self.code = HammingCode(4, 512)
+        self.data = bytes(self.random.getrandbits(8) for _ in range(3 * self.code.data_size + 5))
+
+    def test_bad_init(self):
+        """Codes need 2 parity bits and frames large enough to carry a byte of data"""
+        with self.assertRaises(ValueError):
+            HammingCode(1, 512)
+        with self.assertRaises(ValueError):
+            HammingCode(4, 8)
+
+    def test_sizes(self):
+        """Hamming(15, 11) carries 34 codewords, 46 data bytes, in a 512 bit frame"""
+        self.assertEqual((self.code.n, self.code.k), (15, 11))
+        self.assertEqual(self.code.data_size, 46)
+        self.assertEqual(self.code.words, 34)
+        self.assertEqual(self.code.frames(len(self.data)), 4)
+
+    def test_encode(self):
+        """Codewords carry the data bits followed by their parity bits"""
+        frames = self.code.encode(self.data)
+        self.assertEqual(len(frames), 4 * self.code.frame_size)
+        bits = np.unpackbits(np.frombuffer(frames, dtype=np.uint8)).reshape(4, -1)
+        code = bits[:, :self.code.words * self.code.n].reshape(4, self.code.words, self.code.n)
+        data = np.unpackbits(np.frombuffer(self.data.ljust(4 * self.code.data_size, b'\x00'), dtype=np.uint8))
+        self.assertTrue((code[:, :, :self.code.k].reshape(4, -1)[:, :self.code.data_size * 8].ravel() == data).all())
+        # padding after the codewords is null
+        self.assertFalse(bits[:, self.code.words * self.code.n:].any())
+
+    def test_roundtrip(self):
+        """Uncorrupted frames decode to the padded payload without corrections"""
+        data, corrected = self.code.decode(self.code.encode(self.data))
+        self.assertEqual(data, self.data.ljust(4 * self.code.data_size, b'\x00'))
+        self.assertEqual(corrected, 0)
+
+    def test_single_bit_correction(self):
+        """Every bit position of a codeword, data or parity, is corrected"""
+        frames = self.code.encode(self.data)
+        expected = self.data.ljust(4 * self.code.data_size, b'\x00')
+        for position in range(self.code.n):
+            data, corrected = self.code.decode(flip(frames, [position]))
+            self.assertEqual(data, expected)
+            self.assertEqual(corrected, 1)
+
+    def test_correction_per_codeword(self):
+        """One flipped bit in each codeword of each frame is corrected"""
+        frames = self.code.encode(self.data)
+        positions = [frame * self.code.frame_bits + word * self.code.n + self.random.randrange(self.code.n)
+                     for frame in range(4) for word in range(self.code.words)]
+        data, corrected = self.code.decode(flip(frames, positions))
+        self.assertEqual(data, self.data.ljust(4 * self.code.data_size, b'\x00'))
+        self.assertEqual(corrected, len(positions))
+
+    def test_double_bit_error(self):
+        """Two flipped bits in a codeword are beyond the code and corrupt the decoded block"""
+        frames = self.code.encode(self.data)
+        data, _ = self.code.decode(flip(frames, [0, 1]))
+        self.assertNotEqual(data, self.data.ljust(4 * self.code.data_size, b'\x00'))
+
+
+if __name__ == "__main__":
+    unittest.main()
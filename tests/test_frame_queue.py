@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Frame Queue Unittest Suite
+==========================
+Unittest cases validating the zero-copy segmentation of `FrameQueue` and the watermark backpressure
+it applies to its producers.
+
+Dependencies
+------------
+>>> import asyncio
+>>> import unittest
+>>> from queue import Empty, Full
+>>> from tcs.tcu.frame_queue import FrameQueue
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import asyncio
+import unittest
+from queue import Empty, Full
+
+from tcs.tcu.frame_queue import FrameQueue
+
+
+class TestFrameQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = FrameQueue(8, high_watermark=32, low_watermark=16, maxsize=64)
+
+    def drain(self, frames: int) -> bytes:
+        return b''.join(bytes(self.queue.get()[0]) for _ in range(frames))
+
+    def test_bad_init(self):
+        """Watermarks must be ordered below the queue size"""
+        with self.assertRaises(ValueError):
+            FrameQueue(8, high_watermark=16, low_watermark=16, maxsize=64)
+        with self.assertRaises(ValueError):
+            FrameQueue(8, high_watermark=128, low_watermark=16, maxsize=64)
+
+    def test_segmentation(self):
+        """Payloads are handed out in frames tagged with their payload, the final frame may be short"""
+        asyncio.run(self.queue.push(bytes(range(20)), 'a'))
+        asyncio.run(self.queue.push(b'', 'empty'))
+        asyncio.run(self.queue.push(bytearray(b'xyz'), 'b'))
+        self.assertEqual((len(self.queue), self.queue.depth), (4, 23))
+        frames = [self.queue.get() for _ in range(4)]
+        self.assertEqual([bytes(frame) for frame, _ in frames], [bytes(range(8)), bytes(range(8, 16)),
+                                                                 bytes(range(16, 20)), b'xyz'])
+        self.assertEqual([tag for _, tag in frames], ['a', 'a', 'a', 'b'])
+        self.assertIsInstance(frames[0][0], memoryview)
+        self.assertTrue(self.queue.empty())
+        with self.assertRaises(Empty):
+            self.queue.get()
+
+    def test_full(self):
+        """Payloads that cannot fit above the low watermark are refused"""
+        with self.assertRaises(Full):
+            asyncio.run(self.queue.push(bytes(64 - 16 + 1)))
+        asyncio.run(self.queue.push(bytes(64 - 16)))
+        self.assertEqual(self.queue.depth, 48)
+
+    def test_watermarks(self):
+        """The queue pauses at the high watermark and resumes at the low watermark"""
+        asyncio.run(self.queue.push(bytes(24)))
+        self.assertFalse(self.queue.paused)
+        asyncio.run(self.queue.push(bytes(8)))
+        self.assertTrue(self.queue.paused)
+        self.drain(1)
+        self.assertTrue(self.queue.paused)
+        self.drain(1)
+        self.assertFalse(self.queue.paused)
+        self.assertEqual(self.queue.depth, 16)
+        self.assertGreater(self.queue.paused_time, 0.0)
+
+    def test_backpressure(self):
+        """Producers wait while the queue is paused and are resumed once it drains"""
+
+        async def exchange():
+            await self.queue.push(bytes(32), 'first')
+            pushed = asyncio.ensure_future(self.queue.push(bytes(8), 'second'))
+            await asyncio.sleep(0.01)
+            self.assertFalse(pushed.done())
+            self.drain(1)
+            await asyncio.sleep(0.01)
+            self.assertFalse(pushed.done())
+            self.drain(1)
+            await asyncio.wait_for(pushed, 1)
+            self.assertEqual(self.queue.depth, 24)
+
+        asyncio.run(exchange())
+        self.assertEqual([self.queue.get()[1] for _ in range(3)], ['first', 'first', 'second'])
+
+    def test_oversize_pause(self):
+        """A payload that does not fit pauses the queue until it drains to the low watermark"""
+
+        async def exchange():
+            await self.queue.push(bytes(24))
+            pushed = asyncio.ensure_future(self.queue.push(bytes(48)))
+            await asyncio.sleep(0.01)
+            self.assertTrue(self.queue.paused)
+            self.assertFalse(pushed.done())
+            self.drain(1)
+            await asyncio.wait_for(pushed, 1)
+            self.assertEqual(self.queue.depth, 64)
+
+        asyncio.run(exchange())
+
+    def test_discard(self):
+        """Discarding a tag removes its payloads, including the remainder of a partly handed out payload"""
+        asyncio.run(self.queue.push(bytes(20), 'a'))
+        asyncio.run(self.queue.push(b'b' * 8, 'b'))
+        asyncio.run(self.queue.push(bytes(8), 'a'))
+        self.queue.get()
+        self.assertTrue(self.queue.paused)
+        self.assertEqual(self.queue.discard('a'), 12 + 8)
+        self.assertEqual(self.queue.discard('c'), 0)
+        self.assertFalse(self.queue.paused)
+        self.assertEqual((len(self.queue), self.queue.depth), (1, 8))
+        self.assertEqual(self.queue.get(), (memoryview(b'b' * 8), 'b'))
+        self.assertTrue(self.queue.empty())
+
+    def test_clear(self):
+        """Clearing the queue resumes paused producers"""
+        asyncio.run(self.queue.push(bytes(40)))
+        self.queue.get()
+        self.assertTrue(self.queue.paused)
+        self.queue.clear()
+        self.assertFalse(self.queue.paused)
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(len(self.queue), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
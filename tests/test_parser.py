@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Payload Parser Unittest Suite
+=============================
+Unittest cases validating the memory mapped frame reads of `PayloadFile` and the listing of the
+payload directory.
+
+Dependencies
+------------
+>>> import random
+>>> import tempfile
+>>> import unittest
+>>> from pathlib import Path
+>>> from tcs.file.parser import PayloadFile, payloads
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from tcs.file.parser import PayloadFile, payloads
+
+
+class TestPayloadFile(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(0)
+        self._directory = tempfile.TemporaryDirectory()
+        self.root = Path(self._directory.name)
+        self.data = bytes(self.random.getrandbits(8) for _ in range(8 * 5 + 3))
+        self.path = self.root / 'payload.bin'
+        self.path.write_bytes(self.data)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_frames(self):
+        """Frames are views of the mapping, the final frame is padded with null bytes"""
+        with PayloadFile(self.path, 8) as payload:
+            self.assertEqual((len(payload), payload.size), (6, len(self.data)))
+            frames = list(payload.frames())
+            self.assertTrue(all(isinstance(frame, memoryview) and len(frame) == 8 for frame in frames))
+            self.assertEqual(b''.join(frames), self.data + bytes(5))
+            for frame in frames: frame.release()
+
+    def test_frame(self):
+        """Frames are read by index, whole frames without copying"""
+        with PayloadFile(self.path, 8) as payload:
+            frame = payload.frame(2)
+            self.assertEqual(bytes(frame), self.data[16:24])
+            self.assertTrue(frame.readonly)
+            frame.release()
+            self.assertEqual(bytes(payload.frame(5)), self.data[40:] + bytes(5))
+            for index in (-1, 6):
+                with self.assertRaises(IndexError):
+                    payload.frame(index)
+
+    def test_view(self):
+        """The whole payload is viewed unpadded"""
+        with PayloadFile(self.path, 8) as payload:
+            view = payload.view()
+            self.assertEqual(bytes(view), self.data)
+            view.release()
+
+    def test_empty(self):
+        """Empty files carry no frames"""
+        path = self.root / 'empty'
+        path.write_bytes(b'')
+        with PayloadFile(path, 8) as payload:
+            self.assertEqual(len(payload), 0)
+            self.assertEqual(list(payload.frames()), [])
+            self.assertEqual(bytes(payload.view()), b'')
+
+    def test_close_with_views(self):
+        """A payload closed while a view remains is unmapped once the view is released"""
+        payload = PayloadFile(self.path, 8)
+        frame = payload.frame(0)
+        payload.close()
+        self.assertEqual(bytes(frame), self.data[:8])
+        frame.release()
+
+    def test_missing(self):
+        with self.assertRaises(OSError):
+            PayloadFile(self.root / 'missing')
+
+    def test_payloads(self):
+        """Payload directories are listed by name without hidden files or subdirectories"""
+        for name in ('b.txt', 'a.bin', '.hidden'): (self.root / name).write_bytes(b'x')
+        (self.root / 'nested').mkdir()
+        self.assertEqual([path.name for path in payloads(self.root)], ['a.bin', 'b.txt', 'payload.bin'])
+        with self.assertRaises(FileNotFoundError):
+            payloads(self.root / 'missing')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Protocol Unittest Suite
+=======================
+Unittest cases validating the binary framing of LFTP messages and the incremental `MessageParser`.
+
+Dependencies
+------------
+>>> import unittest
+>>> from tcs.tcp.protocol import HEADER, MAGIC, MAX_PAYLOAD, VERSION, Message, MessageParser, MessageType
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import unittest
+
+from tcs.tcp.protocol import HEADER, MAGIC, MAX_PAYLOAD, VERSION, Message, MessageParser, MessageType
+
+
+class TestMessage(unittest.TestCase):
+
+    def test_text_roundtrip(self):
+        """Text messages decode to the message they were encoded from"""
+        message = Message(MessageType.SACK, 12, 3054)
+        self.assertEqual(Message.decode(message.encode()), message)
+
+    def test_unknown_text_type(self):
+        with self.assertRaises(ValueError):
+            Message.decode(b"0~BOGUS~1\n")
+
+    def test_pack_header(self):
+        """Packed messages carry the header fields followed by the payload"""
+        message = Message.data(MessageType.DATA, 7, b'payload')
+        packet = message.pack()
+        self.assertEqual(HEADER.unpack_from(packet),
+                         (MAGIC, VERSION, MessageType.DATA, 7, message.crc, len(b'payload')))
+        self.assertEqual(packet[HEADER.size:], b'payload')
+
+
+class TestMessageParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = MessageParser()
+        self.messages = [Message.data(MessageType.DATA, 0, b'first chunk'), Message(MessageType.ACK, 1, 42),
+                         Message.data(MessageType.HELLO, 4, b'token fec=3')]
+        self.stream = b''.join(message.pack() for message in self.messages)
+
+    def test_coalesced(self):
+        """Several messages in a single read"""
+        self.assertEqual(self.parser.feed(self.stream), self.messages)
+
+    def test_split_reads(self):
+        """Messages split across reads at every byte are parsed once complete"""
+        parsed = []
+        for i in range(len(self.stream)):
+            parsed.extend(self.parser.feed(self.stream[i:i + 1]))
+        self.assertEqual(parsed, self.messages)
+
+    def test_partial_header(self):
+        self.assertEqual(self.parser.feed(self.stream[:HEADER.size - 1]), [])
+        self.assertEqual(self.parser.feed(self.stream[HEADER.size - 1:]), self.messages)
+
+    def test_bad_magic(self):
+        packet = bytearray(self.messages[1].pack())
+        packet[0] ^= 0xFF
+        with self.assertRaises(ValueError):
+            self.parser.feed(bytes(packet))
+
+    def test_bad_version(self):
+        packet = bytearray(self.messages[1].pack())
+        packet[1] = VERSION + 1
+        with self.assertRaises(ValueError):
+            self.parser.feed(bytes(packet))
+
+    def test_oversized_length(self):
+        """Oversized payloads are rejected from the header, before the payload is buffered"""
+        header = HEADER.pack(MAGIC, VERSION, MessageType.DATA, 0, 0, MAX_PAYLOAD + 1)
+        with self.assertRaises(ValueError):
+            self.parser.feed(header)
+
+    def test_checksum_mismatch(self):
+        packet = bytearray(self.messages[0].pack())
+        packet[-1] ^= 1
+        with self.assertRaises(ValueError):
+            self.parser.feed(bytes(packet))
+
+
+if __name__ == "__main__":
+    unittest.main()
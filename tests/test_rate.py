@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Rate Controller Unittest Suite
+==============================
+Unittest cases validating the additive increase, multiplicative decrease of `RateController`, the
+hold off between decreases and the pacing of frames at the controlled rate.
+
+Dependencies
+------------
+>>> import time
+>>> import asyncio
+>>> import unittest
+>>> from unittest import mock
+>>> from tcs.tcu.config import TCUConfig as tc
+>>> from tcs.tcu.rate import RateController
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import time
+import asyncio
+import unittest
+from unittest import mock
+
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcu.rate import RateController
+
+
+class TestRateController(unittest.TestCase):
+
+    def setUp(self):
+        self.control = RateController(rate=10.0, minimum=1.0, maximum=12.0, step=0.5, decrease=0.5)
+
+    def test_additive_increase(self):
+        """Clean responses raise the rate by a step up to the maximum"""
+        self.assertEqual(self.control.update(0.0), 10.5)
+        for _ in range(10): self.control.update(tc.NACK_LOW / 2)
+        self.assertEqual(self.control.rate, 12.0)
+        self.assertEqual(self.control.increases, 4)
+
+    def test_steady(self):
+        """Retransmission rates between the thresholds leave the rate unchanged"""
+        self.assertEqual(self.control.update((tc.NACK_LOW + tc.NACK_HIGH) / 2), 10.0)
+        self.assertEqual((self.control.increases, self.control.decreases), (0, 0))
+
+    def test_multiplicative_decrease(self):
+        """Capture failures past the high threshold cut the rate once per hold off, down to the minimum"""
+        with mock.patch('tcs.tcu.rate.time.monotonic', return_value=100.0) as monotonic:
+            self.assertEqual(self.control.update(1.0), 5.0)
+            # failures of frames displayed at the old rate do not compound the decrease
+            self.assertEqual(self.control.update(1.0), 5.0)
+            monotonic.return_value += tc.RATE_HOLD
+            self.assertEqual(self.control.update(1.0), 2.5)
+            for _ in range(4):
+                monotonic.return_value += tc.RATE_HOLD
+                self.control.update(1.0)
+        self.assertEqual(self.control.rate, 1.0)
+        self.assertEqual(self.control.decreases, 6)
+
+    def test_pace(self):
+        """Frames are paced at the controlled rate"""
+        self.control = RateController(rate=50.0)
+
+        async def pace(frames):
+            for _ in range(frames): await self.control.pace()
+
+        start = time.monotonic()
+        asyncio.run(pace(6))
+        # the first frame is displayed at once
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
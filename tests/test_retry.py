@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Retry Budget Unittest Suite
+===========================
+Unittest cases validating the exponential backoff, per frame retry limit, session budget and
+smoothed retransmission rate of `RetryBudget`.
+
+Dependencies
+------------
+>>> import unittest
+>>> from tcs.tcp.retry import RetryBudget
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import unittest
+
+from tcs.tcp.retry import RetryBudget
+
+
+class TestRetryBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.retry = RetryBudget(budget=8, limit=5, backoff=0.05, ceiling=0.3, smoothing=0.5)
+
+    def test_backoff(self):
+        """Consecutive failures of a frame double its delay up to the ceiling"""
+        self.assertEqual([self.retry.nack(0) for _ in range(4)], [0.05, 0.1, 0.2, 0.3])
+        self.assertEqual((self.retry.retransmissions, self.retry.remaining), (4, 4))
+
+    def test_backoff_per_frame(self):
+        """Each frame backs off on its own and an acknowledgment resets its backoff"""
+        self.assertEqual(self.retry.nack(0), 0.05)
+        self.assertEqual(self.retry.nack(1), 0.05)
+        self.assertEqual(self.retry.nack(0), 0.1)
+        self.retry.ack(0)
+        self.assertEqual(self.retry.nack(0), 0.05)
+        self.assertEqual(self.retry.nack(1), 0.1)
+
+    def test_limit(self):
+        """A frame failing capture `limit` times terminates the session"""
+        for _ in range(4): self.retry.nack(0)
+        with self.assertRaisesRegex(RuntimeError, "retry limit"):
+            self.retry.nack(0)
+
+    def test_budget(self):
+        """Retransmissions across all frames are bounded by the session budget"""
+        for seq in range(8): self.retry.nack(seq)
+        self.assertEqual(self.retry.remaining, 0)
+        with self.assertRaisesRegex(RuntimeError, "budget of 8 frames exhausted"):
+            self.retry.nack(8)
+
+    def test_rate(self):
+        """The retransmission rate is seeded by the first response and smoothed over the following ones"""
+        self.retry.nack(0)
+        self.assertEqual(self.retry.rate, 1.0)
+        self.retry.ack(0)
+        self.assertEqual(self.retry.rate, 0.5)
+        self.retry.ack(1)
+        self.assertEqual(self.retry.rate, 0.25)
+        self.assertEqual(self.retry.responses, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
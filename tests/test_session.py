@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Receiver Session Unittest Suite
+===============================
+Unittest cases validating the sliding window exchange of a binary `Session`: the streamed upload,
+cumulative (`ACK`) and selective (`SACK`) acknowledgments and retransmission on `NACK`, against a
+receiver connected over a local socket.
+
+Dependencies
+------------
+>>> import asyncio
+>>> import binascii
+>>> import unittest
+>>> from unittest import mock
+>>> from collections import deque
+>>> from typing import Awaitable, Callable, Deque, List
+>>> from tcs.event.registry import Registry as events
+>>> from tcs.cache.cache import AccessPoint
+>>> from tcs.tcu.config import TCUConfig as tc
+>>> from tcs.tcp.config import APConfig as ac
+>>> from tcs.tcp.protocol import Message, MessageParser, MessageType
+>>> from tcs.tcp.session import Session
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import asyncio
+import binascii
+import unittest
+from unittest import mock
+from collections import deque
+from typing import Awaitable, Callable, Deque, List
+
+from tcs.event.registry import Registry as events
+from tcs.cache.cache import AccessPoint
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcp.config import APConfig as ac
+from tcs.tcp.protocol import Message, MessageParser, MessageType
+from tcs.tcp.session import Session
+
+# channel of the sessions under test, no tcu serves it
+CHANNEL = 9
+# payloads queued, credits granted and sessions released on the channel
+enqueued: List[bytes] = []
+credits: List[int] = []
+released: List[int] = []
+
+
+async def enqueue(data: bytes, ap: AccessPoint, _session: int) -> None:
+    if ap.channel == CHANNEL: enqueued.append(bytes(data))
+
+
+async def uplink(channel: int, _session: int, frames: int = 1) -> None:
+    if channel == CHANNEL: credits.append(frames)
+
+
+async def release(ap: AccessPoint, session: int) -> None:
+    if ap.channel == CHANNEL: released.append(session)
+
+
+events.enqueue.register(enqueue)
+events.uplink.register(uplink)
+events.release.register(release)
+
+
+class Receiver:
+    """Receiver end of a binary session"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.parser = MessageParser()
+        self.pending: Deque[Message] = deque()
+
+    async def send(self, message: Message) -> None:
+        self.writer.write(message.pack())
+        await self.writer.drain()
+
+    async def receive(self, timeout: float = 2.0) -> Message:
+        while not self.pending:
+            data = await asyncio.wait_for(self.reader.read(4096), timeout)
+            if not data: raise ConnectionResetError
+            self.pending.extend(self.parser.feed(data))
+        return self.pending.popleft()
+
+    async def begin(self, data: bytes, chunk: int = ac.UPLOAD_BUFFER) -> None:
+        await self.send(Message(MessageType.BEGIN, len(data), 0))
+        reply = await self.receive()
+        assert reply == Message(MessageType.BEGIN, ac.UPLOAD_BUFFER, 0)
+        for i in range(0, len(data), chunk): await self.send(Message.data(MessageType.DATA, i, data[i:i + chunk]))
+
+    async def respond(self, kind: MessageType, up: Message) -> None:
+        # responses carry the crc32 of the UP message they answer
+        await self.send(Message(kind, up.seq, binascii.crc32(up.pack())))
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        enqueued.clear()
+        credits.clear()
+        released.clear()
+        self.frames = 10
+        self.data = bytes(range(self.frames * tc.FRAME_SIZE))
+
+    def frame(self, seq: int) -> bytes:
+        return self.data[seq * tc.FRAME_SIZE:(seq + 1) * tc.FRAME_SIZE]
+
+    def exchange(self, window: int, receive: Callable[[Receiver], Awaitable[None]]) -> None:
+
+        async def run():
+            closed = asyncio.Event()
+
+            async def accept(reader, writer):
+                try:
+                    await Session(reader, writer, AccessPoint(CHANNEL, 0), window, MessageParser()).run()
+                finally:
+                    closed.set()
+
+            server = await asyncio.start_server(accept, 'localhost', 0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                try:
+                    await receive(Receiver(reader, writer))
+                finally:
+                    writer.close()
+                await asyncio.wait_for(closed.wait(), 5)
+
+        asyncio.run(run())
+
+    async def full(self, receiver: Receiver) -> None:
+        # the window is full, no further frame is sent until one is acknowledged
+        with self.assertRaises(asyncio.TimeoutError):
+            await receiver.receive(0.2)
+
+    async def up(self, receiver: Receiver, seq: int) -> Message:
+        up = await receiver.receive()
+        self.assertEqual((up.type, up.seq, up.crc), (MessageType.UP, seq, binascii.crc32(self.frame(seq))))
+        return up
+
+    def test_cumulative_ack(self):
+        """Up to a window of frames is in flight, a cumulative ACK slides the window past every frame it covers"""
+
+        async def receive(receiver):
+            await receiver.begin(self.data)
+            seq = 0
+            while seq < self.frames:
+                ups = [await self.up(receiver, s) for s in range(seq, min(seq + 4, self.frames))]
+                await self.full(receiver)
+                await receiver.respond(MessageType.ACK, ups[-1])
+                seq += len(ups)
+
+        self.exchange(4, receive)
+        self.assertEqual(b''.join(enqueued), self.data)
+        # the window opened up front is closed again, leaving a credit per acknowledged frame
+        self.assertEqual(sum(credits), self.frames)
+        self.assertEqual(len(released), 1)
+
+    def test_streamed_upload(self):
+        """A payload uploaded in chunks that do not align to frames is queued in whole frames"""
+
+        async def receive(receiver):
+            await receiver.begin(self.data, 13)
+            for seq in range(self.frames): await receiver.respond(MessageType.ACK, await self.up(receiver, seq))
+
+        self.exchange(4, receive)
+        self.assertGreater(len(enqueued), 1)
+        self.assertTrue(all(len(chunk) % tc.FRAME_SIZE == 0 for chunk in enqueued))
+        self.assertEqual(b''.join(enqueued), self.data)
+
+    def test_selective_ack(self):
+        """Selectively acknowledged frames slide the window once the first frame in flight is acknowledged"""
+
+        async def receive(receiver):
+            await receiver.begin(self.data)
+            ups = [await self.up(receiver, seq) for seq in range(4)]
+            for up in reversed(ups[1:]): await receiver.respond(MessageType.SACK, up)
+            await self.full(receiver)
+            await receiver.respond(MessageType.SACK, ups[0])
+            ups = [await self.up(receiver, seq) for seq in range(4, 8)]
+            await receiver.respond(MessageType.SACK, ups[2])
+            await receiver.respond(MessageType.ACK, ups[1])
+            ups = [await self.up(receiver, seq) for seq in range(8, 10)]
+            # frames acknowledged twice are not counted twice
+            await receiver.respond(MessageType.SACK, ups[1])
+            await receiver.respond(MessageType.ACK, ups[1])
+
+        self.exchange(4, receive)
+        self.assertEqual(sum(credits), self.frames)
+
+    def test_nack(self):
+        """A frame that fails capture is queued again and its UP resent before the window slides"""
+
+        async def receive(receiver):
+            await receiver.begin(self.data[:4 * tc.FRAME_SIZE])
+            ups = [await self.up(receiver, seq) for seq in range(2)]
+            await receiver.respond(MessageType.NACK, ups[0])
+            self.assertEqual(await self.up(receiver, 0), ups[0])
+            await self.full(receiver)
+            await receiver.respond(MessageType.ACK, ups[1])
+            ups = [await self.up(receiver, seq) for seq in range(2, 4)]
+            await receiver.respond(MessageType.ACK, ups[1])
+
+        self.exchange(2, receive)
+        self.assertEqual(enqueued, [self.data[:4 * tc.FRAME_SIZE], self.frame(0)])
+        # the retransmitted frame is granted its own credit
+        self.assertEqual(sum(credits), 4 + 1)
+
+    def test_socket_error(self):
+        """A response that does not match the UP it answers terminates the session and releases its window"""
+
+        async def receive(receiver):
+            await receiver.begin(self.data)
+            await self.up(receiver, 0)
+            await receiver.send(Message(MessageType.ACK, 0, 0))
+            with self.assertRaises(ConnectionResetError):
+                while True: await receiver.receive()
+
+        with self.assertLogs('tcs.tcp.session', 'ERROR'):
+            self.exchange(4, receive)
+        self.assertEqual(sum(credits), 0)
+        self.assertEqual(len(released), 1)
+
+    def test_timeout(self):
+        """A receiver that stops responding during a transfer is disconnected and its window released"""
+
+        async def receive(receiver):
+            await receiver.begin(self.data)
+            await self.up(receiver, 0)
+            with self.assertRaises(ConnectionResetError):
+                while True: await receiver.receive()
+
+        with mock.patch.object(ac, 'SESSION_TIMEOUT', 0.2), self.assertLogs('tcs.tcp.session', 'ERROR') as logs:
+            self.exchange(4, receive)
+        self.assertIn("did not respond within 0.2s", logs.output[-1])
+        self.assertEqual(sum(credits), 0)
+        self.assertEqual(len(released), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Frame Store Unittest Suite
+==========================
+Unittest cases validating the frame store format, incremental recompilation from a previous store
+and the batched hardware encoding of `SpatialCodec` the store is compiled with.
+
+Dependencies
+------------
+>>> import os
+>>> import random
+>>> import binascii
+>>> import tempfile
+>>> import unittest
+>>> from pathlib import Path
+>>> from tcs.tcu.config import TCUConfig as tc
+>>> from tcs.tcu.codec import ACCESS_POINTS, SpatialCodec
+>>> from tcs.file.store import HEADER, MAGIC, VERSION, FrameStore, compile_store
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import os
+import random
+import binascii
+import tempfile
+import unittest
+from pathlib import Path
+
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcu.codec import ACCESS_POINTS, SpatialCodec
+from tcs.file.store import HEADER, MAGIC, VERSION, FrameStore, compile_store
+
+
+class TestFrameStore(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(0)
+        self.frame_size = pow(tc.DIM, 3) // 8
+        self.codec = SpatialCodec(tc.DIM, tc.HARDWARE_MAPS[tc.DIM])
+        self._directory = tempfile.TemporaryDirectory()
+        self.root = Path(self._directory.name)
+        self.payloads = self.root / 'payload'
+        self.payloads.mkdir()
+        self.path = self.root / 'payload.frames'
+        # whole frames, a padded final frame, an empty file and a hidden file skipped by the store
+        self.files = {'a.bin': self.data(4 * self.frame_size), 'b.txt': self.data(3 * self.frame_size + 3),
+                      'c.empty': b''}
+        for name, data in self.files.items(): self.write(name, data)
+        self.write('.hidden', self.data(self.frame_size))
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def data(self, size: int) -> bytes:
+        return bytes(self.random.getrandbits(8) for _ in range(size))
+
+    def write(self, name: str, data: bytes) -> None:
+        (self.payloads / name).write_bytes(data)
+
+    def test_format(self):
+        """The header, index and sections describe every frame of every payload file"""
+        entries = compile_store(self.payloads, self.path)
+        self.assertEqual([entry.name for entry in entries], sorted(self.files))
+        magic, version, dim, access_points, files, frames, _ = HEADER.unpack_from(self.path.read_bytes())
+        self.assertEqual((magic, version, dim, access_points, files), (MAGIC, VERSION, tc.DIM, ACCESS_POINTS, 3))
+        self.assertEqual(frames, 4 + 4)
+        with FrameStore(self.path) as store:
+            self.assertEqual(len(store), 3)
+            self.assertNotIn('.hidden', store)
+            for name, data in self.files.items():
+                count = -(-len(data) // self.frame_size)
+                padded = data.ljust(count * self.frame_size, b'\x00')
+                stat = os.stat(self.payloads / name)
+                self.assertEqual(store.signatures()[name], (stat.st_size, stat.st_mtime_ns))
+                self.assertEqual(bytes(store.frames(name)), padded)
+                for i in range(count):
+                    frame = padded[i * self.frame_size:(i + 1) * self.frame_size]
+                    self.assertEqual(bytes(store.frame(name, i)), frame)
+                    self.assertEqual(store.crc(name, i), binascii.crc32(frame))
+                with self.assertRaises(IndexError):
+                    store.frame(name, count)
+            with self.assertRaises(KeyError):
+                store.frames('missing')
+
+    def test_bad_store(self):
+        """Files that are not a store for the cube dimension are refused"""
+        compile_store(self.payloads, self.path)
+        with self.assertRaises(ValueError):
+            FrameStore(self.path, tc.DIM + 1)
+        (self.root / 'bogus').write_bytes(b'not a store')
+        with self.assertRaises(ValueError):
+            FrameStore(self.root / 'bogus')
+
+    def test_hardware(self):
+        """Stored hardware frames match the frames encoded one at a time for every access point"""
+        compile_store(self.payloads, self.path)
+        with FrameStore(self.path) as store:
+            for name in self.files:
+                for i in range(store.entries[name].count):
+                    frame = bytes(store.frame(name, i))
+                    for ap in range(ACCESS_POINTS):
+                        hardware, _ = self.codec.encode(frame, ap)
+                        self.assertEqual(bytes(store.hardware(name, i, ap)), bytes(hardware))
+                with self.assertRaises(IndexError):
+                    store.hardware(name, 0, ACCESS_POINTS)
+
+    def test_codec_hardware(self):
+        """Batched hardware encoding matches encoding each frame on its own"""
+        frames = self.data(16 * self.frame_size)
+        for ap in range(ACCESS_POINTS):
+            expected = b''.join(bytes(self.codec.encode(frames[i:i + self.frame_size], ap)[0])
+                                for i in range(0, len(frames), self.frame_size))
+            self.assertEqual(self.codec.hardware(frames, ap), expected)
+
+    def test_incremental(self):
+        """A store recompiled from a previous one is identical to a fresh compile"""
+        compile_store(self.payloads, self.path)
+        # a.bin is unchanged but moves behind the new first file
+        self.write('0.bin', self.data(2 * self.frame_size))
+        self.write('b.txt', self.data(5 * self.frame_size + 1))
+        os.remove(self.payloads / 'c.empty')
+        with FrameStore(self.path) as previous:
+            incremental = self.root / 'incremental.frames'
+            with self.assertLogs('tcs.file.store') as logs:
+                compile_store(self.payloads, incremental, previous=previous)
+        self.assertIn("1 unchanged files reused", logs.output[-1])
+        fresh = self.root / 'fresh.frames'
+        compile_store(self.payloads, fresh)
+        self.assertEqual(incremental.read_bytes(), fresh.read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
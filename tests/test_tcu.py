@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Transmission Control Unit Unittest Suite
+========================================
+Unittest cases validating the uplink credits of the `TransmissionControlUnit` and their release once
+the session that granted them closes.
+
+Dependencies
+------------
+>>> import asyncio
+>>> import unittest
+>>> from unittest import mock
+>>> from tcs.tcu import transmitter
+>>> from tcs.tcu.config import TCUConfig as tc
+>>> from tcs.tcu.tcu import TransmissionControlUnit
+>>> from tcs.cache.cache import AccessPoint
+
+Copyright © 2021 LEAP. All Rights Reserved.
+"""
+import asyncio
+import unittest
+from unittest import mock
+
+from tcs.tcu import transmitter
+from tcs.tcu.config import TCUConfig as tc
+from tcs.tcu.tcu import TransmissionControlUnit
+from tcs.cache.cache import AccessPoint
+
+# channel of the unit under test, events of other channels are ignored by it
+CHANNEL = 7
+
+
+class TestTransmissionControlUnit(unittest.TestCase):
+
+    def setUp(self):
+        self.tcu = TransmissionControlUnit(transmitter.create('null'), CHANNEL)
+        self.ap = AccessPoint(CHANNEL, 1)
+
+    async def remaining(self, frames: int) -> None:
+        # wait for the runner to take frames off the queue until at most `frames` remain
+        for _ in range(100):
+            if len(self.tcu.frame_queue) <= frames: return
+            await asyncio.sleep(0.01)
+        self.fail("{} frames remain queued, expected at most {}".format(len(self.tcu.frame_queue), frames))
+
+    def exchange(self, coroutine) -> None:
+
+        async def run():
+            runner = asyncio.ensure_future(self.tcu.run())
+            try:
+                await asyncio.sleep(0)
+                await coroutine()
+            finally:
+                runner.cancel()
+
+        with mock.patch.object(tc, 'IDLE_SLEEP', 0.01):
+            asyncio.run(run())
+
+    def test_credits(self):
+        """The unit runs as many frames ahead as the session grants credits"""
+
+        async def exchange():
+            await self.tcu.uplink(CHANNEL, 1, 2)
+            await self.tcu.enqueue(bytes(6 * tc.FRAME_SIZE), self.ap, 1)
+            # two credits and the frame held until the next credit
+            await self.remaining(3)
+            await asyncio.sleep(0.3)
+            self.assertEqual(len(self.tcu.frame_queue), 3)
+            await self.tcu.uplink(CHANNEL, 1, 1)
+            await self.remaining(2)
+            # credits granted on other channels do not release the frame
+            await self.tcu.uplink(CHANNEL + 1, 1, 1)
+            await asyncio.sleep(0.3)
+            self.assertEqual(len(self.tcu.frame_queue), 2)
+
+        self.exchange(exchange)
+
+    def test_release(self):
+        """Releasing a session discards its frames and stops holding the display for it"""
+
+        async def exchange():
+            await self.tcu.enqueue(bytes(8 * tc.FRAME_SIZE), self.ap, 1)
+            await self.tcu.enqueue(bytes(4 * tc.FRAME_SIZE), AccessPoint(CHANNEL, 2), 2)
+            await self.remaining(11)
+            await self.tcu.release(self.ap, 1)
+            await self.remaining(4)
+            # frames of the other session are transmitted without waiting out the uplink timeout
+            await self.tcu.uplink(CHANNEL, 2, 4)
+            await self.remaining(0)
+
+        self.exchange(exchange)
+
+
+if __name__ == "__main__":
+    unittest.main()